@@ -0,0 +1,146 @@
+# Offline throughput benchmark for the camera inference pipeline
+#
+#   python bench_inference.py SOURCE [--backend=mediapipe|motion] [--frames=N]
+#                             [--warmup=N] [--hands=N] [--json=PATH]
+#
+# SOURCE is anything main.py --camera= accepts (a clip, an image directory,
+# "synthetic", a camera index). Frames are read without pacing and pushed
+# through the same stages as the game loop as fast as possible:
+#   mediapipe: read -> flip -> cvtColor -> hands.process -> bbox
+#   motion:    read -> process (the backend is one fused stage)
+# and the script reports frames/sec of the pipeline (excluding the read) and
+# per-stage mean / p50 / p95 milliseconds. The first --warmup frames (model
+# load, caches) are run but not counted.
+
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from frame_sources import open_frame_source
+from hand_tracking import GESTURE_BACKENDS
+
+DEFAULT_FRAMES = 300     # cap for endless sources (synthetic, cameras)
+DEFAULT_WARMUP = 10
+
+
+def _mediapipe_stages(backend):
+    def flip(frame):
+        return cv2.flip(frame, 1)
+
+    def cvt_color(frame):
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def process(frame_rgb):
+        return backend.hands.process(frame_rgb)
+
+    def bbox(results):
+        return backend.observations(results)
+
+    return [("flip", flip), ("cvtColor", cvt_color), ("hands.process", process), ("bbox", bbox)]
+
+
+def run(source_spec, backend_name="mediapipe", frames=None, warmup=DEFAULT_WARMUP, hands=1):
+    """Benchmark one source / backend pair; returns the report dict."""
+    backend = GESTURE_BACKENDS[backend_name](max_hands=hands)
+    source = open_frame_source(source_spec, realtime=False, loop=False)
+    if backend_name == "mediapipe":
+        stages = _mediapipe_stages(backend)
+    else:
+        stages = [("process", backend.process)]
+    names = ["read"] + [name for name, _ in stages]
+    timings = {name: [] for name in names}
+    limit = frames or source.length()
+    if limit is None and source.name in ("camera", "synthetic"):
+        limit = DEFAULT_FRAMES  # endless; files of unknown length run to their end
+    detected = 0
+    seen = 0
+    shape = None
+    try:
+        while limit is None or seen < warmup + limit:
+            t = time.perf_counter()
+            ok, value = source.read()
+            if not ok:
+                break
+            shape = value.shape
+            lap = [time.perf_counter() - t]
+            for _, stage in stages:
+                t = time.perf_counter()
+                value = stage(value)
+                lap.append(time.perf_counter() - t)
+            seen += 1
+            if seen > warmup:
+                for name, dt in zip(names, lap):
+                    timings[name].append(dt)
+                detected += bool(value)
+    finally:
+        source.release()
+        backend.close()
+    counted = len(timings["read"])
+    pipeline = sum(np.array(timings[name]) for name in names[1:]) if counted else np.zeros(0)
+    report = {
+        "source": source_spec,
+        "source_type": source.name,
+        "backend": backend_name,
+        "frame_size": list(shape[1::-1]) if shape else None,
+        "frames": counted,
+        "frames_with_hands": detected,
+        "pipeline_fps": round(counted / pipeline.sum(), 1) if counted and pipeline.sum() > 0 else 0.0,
+        "stages": {},
+    }
+    for name in names:
+        ms = np.array(timings[name]) * 1000.0
+        report["stages"][name] = {
+            "mean_ms": round(float(ms.mean()), 3) if counted else 0.0,
+            "p50_ms": round(float(np.percentile(ms, 50)), 3) if counted else 0.0,
+            "p95_ms": round(float(np.percentile(ms, 95)), 3) if counted else 0.0,
+        }
+    return report
+
+
+def print_report(report):
+    size = "x".join(map(str, report["frame_size"])) if report["frame_size"] else "?"
+    print(f"{report['backend']} on {report['source_type']} source {report['source']!r} ({size}): "
+          f"{report['frames']} frames, {report['frames_with_hands']} with hands, "
+          f"{report['pipeline_fps']} frames/s (excluding read)")
+    print(f"  {'stage':<14} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, s in report["stages"].items():
+        print(f"  {name:<14} {s['mean_ms']:>9.3f} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f}")
+
+
+def _main(argv):
+    backend = "mediapipe"
+    frames = None
+    warmup = DEFAULT_WARMUP
+    hands = 1
+    json_path = None
+    positional = []
+    for a in argv:
+        if a.startswith("--backend="):
+            backend = a.split("=", 1)[1].strip().lower()
+        elif a.startswith("--frames="):
+            frames = max(1, int(a.split("=", 1)[1]))
+        elif a.startswith("--warmup="):
+            warmup = max(0, int(a.split("=", 1)[1]))
+        elif a.startswith("--hands="):
+            hands = max(1, min(2, int(a.split("=", 1)[1])))
+        elif a.startswith("--json="):
+            json_path = a.split("=", 1)[1]
+        else:
+            positional.append(a)
+    if len(positional) != 1 or backend not in GESTURE_BACKENDS:
+        print(f"usage: python bench_inference.py SOURCE [--backend={'|'.join(GESTURE_BACKENDS)}] "
+              "[--frames=N] [--warmup=N] [--hands=N] [--json=PATH]")
+        return 2
+    report = run(positional[0], backend, frames, warmup, hands)
+    print_report(report)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,226 @@
+# Array-backed entity store for hazards and power-ups
+#
+# Entities are rows in flat NumPy component arrays (position, velocity, hitbox
+# size, kind, alive) instead of one Python object each, so movement is a few
+# vectorized operations regardless of count. Collision runs in two phases:
+#   1. broadphase: a uniform grid, rebuilt every frame with one argsort, returns
+#      only the entities whose cells overlap the query box
+#   2. narrowphase: pixel-exact pygame.mask overlap against per-kind masks that
+#      are built once when the kind is registered
+# A player query therefore costs O(entities) for the rebuild plus a handful of
+# mask tests, instead of O(n^2) pair checks.
+
+import numpy as np
+import pygame
+
+KIND_NONE = 0
+KIND_HAZARD = 1
+KIND_PICKUP = 2
+KIND_SHIELD = 3
+
+GRID_CELL = 64  # pixels; a bit larger than the biggest entity
+
+# component arrays that make up an entity's simulation state
+COMPONENTS = (("x", np.float32), ("y", np.float32), ("vx", np.float32), ("vy", np.float32),
+              ("w", np.float32), ("h", np.float32), ("kind", np.int8), ("alive", np.bool_))
+
+
+class EntityStore:
+    """Fixed-capacity component arrays with a free list (grows by doubling)."""
+
+    def __init__(self, capacity=256):
+        self.capacity = 0
+        self.x = self.y = self.vx = self.vy = self.w = self.h = None
+        self.kind = self.alive = None
+        self._grow(capacity)
+        self.sprites = {}   # kind -> pygame.Surface
+        self.masks = {}     # kind -> pygame.mask.Mask
+        self.grid = UniformGrid(GRID_CELL)
+
+    def _grow(self, capacity):
+        def grow(a, dtype):
+            out = np.zeros(capacity, dtype=dtype)
+            if a is not None:
+                out[:len(a)] = a
+            return out
+        self.x = grow(self.x, np.float32)
+        self.y = grow(self.y, np.float32)
+        self.vx = grow(self.vx, np.float32)
+        self.vy = grow(self.vy, np.float32)
+        self.w = grow(self.w, np.float32)
+        self.h = grow(self.h, np.float32)
+        self.kind = grow(self.kind, np.int8)
+        self.alive = grow(self.alive, np.bool_)
+        self.capacity = capacity
+
+    def register_kind(self, kind, sprite):
+        """Attach a sprite to a kind and precompute its collision mask."""
+        self.sprites[kind] = sprite
+        self.masks[kind] = pygame.mask.from_surface(sprite)
+
+    def spawn(self, kind, x, y, vx=0.0, vy=0.0):
+        free = np.flatnonzero(~self.alive)
+        if len(free) == 0:
+            i = self.capacity
+            self._grow(self.capacity * 2)
+        else:
+            i = int(free[0])
+        w, h = self.sprites[kind].get_size()
+        self.x[i], self.y[i] = x, y
+        self.vx[i], self.vy[i] = vx, vy
+        self.w[i], self.h[i] = w, h
+        self.kind[i] = kind
+        self.alive[i] = True
+        return i
+
+    def despawn(self, i):
+        self.alive[i] = False
+        self.kind[i] = KIND_NONE
+
+    def clear(self):
+        self.alive[:] = False
+        self.kind[:] = KIND_NONE
+
+    def restore(self, components):
+        """Overwrite the component arrays with a snapshot from EntityHistory.load()."""
+        n = len(components["alive"])
+        if n > self.capacity:
+            self._grow(n)
+        for name, _ in COMPONENTS:
+            getattr(self, name)[:n] = components[name]
+        self.alive[n:] = False
+        self.kind[n:] = KIND_NONE
+        self.grid.rebuild(self)
+
+    def count(self, kind=None):
+        if kind is None:
+            return int(self.alive.sum())
+        return int((self.alive & (self.kind == kind)).sum())
+
+    def step(self, dt, x0, y0, x1, y1):
+        """Integrate velocities and bounce off the (x0, y0, x1, y1) bounds."""
+        a = self.alive
+        self.x[a] += self.vx[a] * dt
+        self.y[a] += self.vy[a] * dt
+        half_w = self.w * 0.5
+        half_h = self.h * 0.5
+        hit_x = a & (((self.x - half_w < x0) & (self.vx < 0)) | ((self.x + half_w > x1) & (self.vx > 0)))
+        hit_y = a & (((self.y - half_h < y0) & (self.vy < 0)) | ((self.y + half_h > y1) & (self.vy > 0)))
+        self.vx[hit_x] *= -1
+        self.vy[hit_y] *= -1
+        self.grid.rebuild(self)
+
+    def collide(self, mask, left, top):
+        """Indices of live entities whose sprite pixels overlap `mask` placed at (left, top)."""
+        mw, mh = mask.get_size()
+        hits = []
+        for i in self.grid.query(self, left, top, left + mw, top + mh):
+            k = int(self.kind[i])
+            ex = int(self.x[i] - self.w[i] * 0.5)
+            ey = int(self.y[i] - self.h[i] * 0.5)
+            if mask.overlap(self.masks[k], (ex - int(left), ey - int(top))) is not None:
+                hits.append(int(i))
+        return hits
+
+    def draw(self, dst, scale=1, sprites=None):
+        """Blit every live entity; `sprites` overrides the per-kind art (e.g. low-res)."""
+        sprites = sprites or self.sprites
+        idx = np.flatnonzero(self.alive)
+        if len(idx) == 0:
+            return
+        lx = ((self.x[idx] - self.w[idx] * 0.5) // scale).astype(np.int32)
+        ty = ((self.y[idx] - self.h[idx] * 0.5) // scale).astype(np.int32)
+        kinds = self.kind[idx]
+        dst.blits([(sprites[int(k)], (int(px), int(py))) for k, px, py in zip(kinds, lx, ty)], False)
+
+
+class UniformGrid:
+    """Bucket entity centers into square cells; rebuilt each frame with one sort."""
+
+    def __init__(self, cell):
+        self.cell = cell
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.max_half = 0.0
+        self.cols = 1
+
+    def rebuild(self, store):
+        idx = np.flatnonzero(store.alive)
+        if len(idx) == 0:
+            self.keys = np.zeros(0, dtype=np.int64)
+            self.order = idx
+            return
+        cx = np.floor(store.x[idx] / self.cell).astype(np.int64)
+        cy = np.floor(store.y[idx] / self.cell).astype(np.int64)
+        self.cols = int(cx.max()) + 2
+        cx += 1  # keep column 0 free for entities slightly off the left edge
+        keys = cy * self.cols + cx
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.order = idx[order]
+        # entities are stored by center: queries are widened by the largest half-size
+        self.max_half = float(max(store.w[idx].max(), store.h[idx].max())) * 0.5
+
+    def query(self, store, x0, y0, x1, y1):
+        """Live entity indices whose hitbox overlaps the box (x0, y0)-(x1, y1)."""
+        if len(self.keys) == 0:
+            return ()
+        m = self.max_half
+        c0 = max(0, int((x0 - m) // self.cell) + 1)
+        c1 = min(self.cols - 1, int((x1 + m) // self.cell) + 1)
+        r0 = int((y0 - m) // self.cell)
+        r1 = int((y1 + m) // self.cell)
+        if c0 > c1:
+            return ()
+        out = []
+        for row in range(r0, r1 + 1):
+            lo = np.searchsorted(self.keys, row * self.cols + c0, side="left")
+            hi = np.searchsorted(self.keys, row * self.cols + c1, side="right")
+            if hi > lo:
+                out.append(self.order[lo:hi])
+        if not out:
+            return ()
+        cand = np.concatenate(out)
+        # exact AABB filter on the few candidates
+        hw = store.w[cand] * 0.5
+        hh = store.h[cand] * 0.5
+        keep = ((store.x[cand] + hw > x0) & (store.x[cand] - hw < x1) &
+                (store.y[cand] + hh > y0) & (store.y[cand] - hh < y1))
+        return cand[keep]
+
+
+class EntityHistory:
+    """Ring storage for EntityStore snapshots (rewind / quick save).
+
+    One (slots, width) array per component, allocated up front; save() copies
+    the live arrays into a slot in place. The width follows the store if it
+    ever grows.
+    """
+
+    def __init__(self, slots, width):
+        self.slots = slots
+        self.width = 0
+        self.arrays = {}
+        self._widen(width)
+
+    def _widen(self, width):
+        for name, dtype in COMPONENTS:
+            out = np.zeros((self.slots, width), dtype=dtype)
+            old = self.arrays.get(name)
+            if old is not None:
+                out[:, :self.width] = old
+            self.arrays[name] = out
+        self.width = width
+
+    def save(self, slot, store):
+        n = store.capacity
+        if n > self.width:
+            self._widen(n)
+        for name, _ in COMPONENTS:
+            a = self.arrays[name]
+            a[slot, :n] = getattr(store, name)
+            a[slot, n:] = 0
+
+    def load(self, slot):
+        """Copies of the component arrays stored in `slot`."""
+        return {name: a[slot].copy() for name, a in self.arrays.items()}
@@ -0,0 +1,185 @@
+# Shared-memory frame export for external compositors (OBS, a second display, ...)
+#
+# The game publishes every presented frame into a named shared-memory block laid
+# out as a small ring of slots. A local consumer process attaches to the same
+# name and reads the newest slot straight out of the mapping; the game thread
+# only does one blit per frame (no encoding, no intermediate copies).
+#
+# Layout (little endian, every section aligned to 64 bytes):
+#   global header : magic b"GDFX", version, slot_count, width, height, pitch,
+#                   pixel format (b"BGRA"), frames_written
+#   slot i        : slot header (seq, frame_index, timestamp, width, height, pitch)
+#                   followed by pitch * height bytes of BGRA pixels
+#
+# Each slot uses a sequence counter (seqlock): the writer makes it odd while the
+# pixels are being written and even again when done. A reader should check that
+# seq was even before reading and unchanged afterwards.
+#
+# Consumer example:
+#   python frame_export.py game_demo_frames
+
+import struct
+import sys
+import time
+
+from multiprocessing import shared_memory
+
+MAGIC = b"GDFX"
+VERSION = 1
+PIXEL_FORMAT = b"BGRA"
+BYTES_PER_PIXEL = 4
+ALIGN = 64
+
+_GLOBAL = struct.Struct("<4sHHIII4sQ")  # magic, version, slots, w, h, pitch, fourcc, frames_written
+_SLOT = struct.Struct("<IQdIII")         # seq, frame_index, timestamp, w, h, pitch
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _layout(width, height, slots):
+    pitch = _align(width * BYTES_PER_PIXEL)
+    header_size = _align(_GLOBAL.size)
+    slot_header = _align(_SLOT.size)
+    slot_stride = slot_header + _align(pitch * height)
+    return pitch, header_size, slot_header, slot_stride, header_size + slots * slot_stride
+
+
+class ShmFrameWriter:
+    """Publish pygame surfaces into a shared-memory ring of BGRA frames."""
+
+    def __init__(self, name, width, height, slots=3):
+        import pygame
+        self.name = name
+        self.width = width
+        self.height = height
+        self.slots = max(2, int(slots))
+        self.pitch, self._hdr, self._slot_hdr, self._stride, size = _layout(width, height, self.slots)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # stale block from a previous run that did not exit cleanly
+            old = shared_memory.SharedMemory(name=name)
+            old.close()
+            old.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.frames_written = 0
+        _GLOBAL.pack_into(self.shm.buf, 0, MAGIC, VERSION, self.slots, width, height,
+                          self.pitch, PIXEL_FORMAT, 0)
+        # One pygame surface per slot that aliases the shared pixels, so
+        # publishing is a single blit straight into the mapping.
+        self._targets = []
+        for i in range(self.slots):
+            off = self._pixels_offset(i)
+            view = self.shm.buf[off:off + self.pitch * height]
+            self._targets.append(pygame.image.frombuffer(view, (width, height), "BGRA", self.pitch))
+
+    def _slot_offset(self, i):
+        return self._hdr + i * self._stride
+
+    def _pixels_offset(self, i):
+        return self._slot_offset(i) + self._slot_hdr
+
+    def publish(self, surface, timestamp=None):
+        """Copy `surface` into the next slot and advance frames_written."""
+        i = self.frames_written % self.slots
+        off = self._slot_offset(i)
+        buf = self.shm.buf
+        seq = struct.unpack_from("<I", buf, off)[0]
+        struct.pack_into("<I", buf, off, seq + 1)  # odd: write in progress
+        self._targets[i].blit(surface, (0, 0))
+        _SLOT.pack_into(buf, off, seq + 2, self.frames_written,
+                        time.time() if timestamp is None else timestamp,
+                        self.width, self.height, self.pitch)
+        self.frames_written += 1
+        struct.pack_into("<Q", buf, _GLOBAL.size - 8, self.frames_written)
+
+    def close(self, unlink=True):
+        # the aliasing surfaces hold exported buffers; drop them first
+        self._targets = []
+        try:
+            self.shm.close()
+            if unlink:
+                self.shm.unlink()
+        except Exception:
+            pass
+
+
+class ShmFrameReader:
+    """Attach to a ShmFrameWriter block from another local process."""
+
+    def __init__(self, name):
+        self.shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Attaching must not make this process unlink the block at exit
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        except Exception:
+            pass
+        magic, version, self.slots, self.width, self.height, self.pitch, fmt, _ = \
+            _GLOBAL.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{name!r} is not a game_demo frame export block")
+        self.pixel_format = fmt.decode()
+        _, self._hdr, self._slot_hdr, self._stride, _ = _layout(self.width, self.height, self.slots)
+
+    def frames_written(self):
+        return struct.unpack_from("<Q", self.shm.buf, _GLOBAL.size - 8)[0]
+
+    def latest(self):
+        """Return (frame_index, timestamp, pixels, seq) for the newest frame, or None.
+
+        `pixels` is a memoryview into shared memory (pitch * height bytes). Copy
+        or consume it, then call still_valid(frame_index, seq) to make sure the
+        writer did not overwrite the slot meanwhile.
+        """
+        n = self.frames_written()
+        if n == 0:
+            return None
+        i = (n - 1) % self.slots
+        off = self._hdr + i * self._stride
+        seq, frame_index, ts, w, h, pitch = _SLOT.unpack_from(self.shm.buf, off)
+        if seq & 1:
+            return None
+        start = off + self._slot_hdr
+        return frame_index, ts, self.shm.buf[start:start + pitch * h], seq
+
+    def still_valid(self, frame_index, seq):
+        off = self._hdr + (frame_index % self.slots) * self._stride
+        return struct.unpack_from("<I", self.shm.buf, off)[0] == seq
+
+    def close(self):
+        try:
+            self.shm.close()
+        except Exception:
+            pass
+
+
+if __name__ == "__main__":
+    # Minimal consumer: report the frame rate seen through shared memory
+    name = sys.argv[1] if len(sys.argv) > 1 else "game_demo_frames"
+    reader = ShmFrameReader(name)
+    print(f"attached to {name}: {reader.width}x{reader.height} pitch={reader.pitch} "
+          f"{reader.pixel_format} slots={reader.slots}")
+    last_index = None
+    last_ts = None
+    count = 0
+    t0 = time.time()
+    try:
+        while True:
+            got = reader.latest()
+            if got is not None and got[0] != last_index:
+                frame_index, last_ts, pixels, seq = got
+                pixels.release()
+                last_index = frame_index
+                count += 1
+            if time.time() - t0 >= 1.0:
+                lag_ms = (time.time() - last_ts) * 1000 if last_ts else 0.0
+                print(f"frame {last_index}  {count} fps  lag {lag_ms:.1f} ms")
+                count = 0
+                t0 = time.time()
+            time.sleep(0.002)
+    except KeyboardInterrupt:
+        pass
+    reader.close()
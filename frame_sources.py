@@ -0,0 +1,228 @@
+# Frame sources for the camera branch of the game loop and for benchmarks
+#
+# Every source has the cv2.VideoCapture subset main.py uses, read() ->
+# (ok, bgr_frame) and release(), so the gesture pipeline does not care where
+# frames come from:
+#   CameraSource    - a webcam index or any URL cv2.VideoCapture accepts
+#   VideoFileSource - a recorded clip (.mp4, .avi, ...)
+#   ImageDirSource  - a directory of still frames, read in name order
+#   SyntheticSource - a generated bright "hand" blob swiping across a dark
+#                     frame (no files needed; exercises the motion backend)
+#
+# File and synthetic sources run in one of two modes. realtime=True (the game)
+# follows the wall clock at the source's frame rate: like VideoCapture.read()
+# on a camera, read() blocks until the next frame is due and never returns the
+# same frame twice, and frames that are already overdue are skipped, so a 30 fps
+# clip drives the game exactly like a 30 fps camera. realtime=False
+# (benchmarks) returns every frame once, as fast as it can be decoded.
+#
+# open_frame_source(spec) picks the source from a --camera= style string.
+
+import os
+import time
+
+import cv2
+import numpy as np
+
+DEFAULT_SOURCE_FPS = 30.0
+SYNTHETIC_SIZE = (640, 480)
+SYNTHETIC_SWIPE_SECONDS = 2.0   # one left-to-right pass of the synthetic blob
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+
+class FrameSource:
+    """Base class: a paced or full-speed stream of BGR frames."""
+
+    name = "base"
+
+    def __init__(self, fps=DEFAULT_SOURCE_FPS, realtime=True, loop=True):
+        self.fps = fps or DEFAULT_SOURCE_FPS
+        self.realtime = realtime
+        self.loop = loop
+        self.frames_read = 0
+        self._t0 = None
+        self._index = -1       # index of the last decoded frame
+
+    def _frame(self, index):
+        """Decode frame `index` (always the next one or later); None past the end."""
+        raise NotImplementedError
+
+    def length(self):
+        """Number of frames, or None when unknown / endless."""
+        return None
+
+    def _wrap(self, index):
+        n = self.length()
+        if n is None or index < n:
+            return index
+        return index % n if self.loop and n else None
+
+    def read(self):
+        index = self._index + 1
+        if self.realtime:
+            now = time.time()
+            if self._t0 is None:
+                self._t0 = now - index / self.fps
+            due = self._t0 + index / self.fps
+            if now < due:
+                # block like a camera read until the next frame exists
+                time.sleep(due - now)
+            else:
+                # fell behind: jump to the newest frame that is due
+                index = max(index, int((now - self._t0) * self.fps))
+        wrapped = self._wrap(index)
+        if wrapped is None:
+            return False, None
+        frame = self._frame(wrapped)
+        if frame is None:
+            return False, None
+        self._index = index
+        self.frames_read += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+    def isOpened(self):
+        return True
+
+
+class CameraSource(FrameSource):
+    """A live device (or stream URL) through cv2.VideoCapture; never paced."""
+
+    name = "camera"
+
+    def __init__(self, device=0, size=None):
+        super().__init__(realtime=False, loop=False)
+        self.cap = cv2.VideoCapture(device)
+        if not self.cap.isOpened():
+            self.cap.release()
+            raise RuntimeError(f"cannot open camera or stream {device!r}")
+        if size:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or DEFAULT_SOURCE_FPS
+
+    def read(self):
+        ok, frame = self.cap.read()
+        if ok:
+            self.frames_read += 1
+        return ok, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Frames of a recorded clip; skipped frames are grabbed but not decoded."""
+
+    name = "video"
+
+    def __init__(self, path, realtime=True, loop=True):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            self.cap.release()
+            raise RuntimeError(f"cannot open video file {path!r}")
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS), realtime, loop)
+        count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.count = count if count > 0 else None
+        self._pos = 0          # index of the next frame in the decoder
+
+    def length(self):
+        return self.count
+
+    def _frame(self, index):
+        if index < self._pos:
+            # looped: rewind the decoder
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._pos = 0
+        while self._pos < index:
+            if not self.cap.grab():
+                return None
+            self._pos += 1
+        ok, frame = self.cap.read()
+        if not ok:
+            if self.loop and self.count is None and index > 0:
+                # unknown length: learn it from where decoding stopped
+                self.count = index
+                return self._frame(0)
+            return None
+        self._pos += 1
+        return frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    """Still frames from a directory, in file name order."""
+
+    name = "images"
+
+    def __init__(self, path, fps=DEFAULT_SOURCE_FPS, realtime=True, loop=True):
+        super().__init__(fps, realtime, loop)
+        self.paths = sorted(os.path.join(path, f) for f in os.listdir(path)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise RuntimeError(f"no images in {path!r}")
+
+    def length(self):
+        return len(self.paths)
+
+    def _frame(self, index):
+        return cv2.imread(self.paths[index], cv2.IMREAD_COLOR)
+
+
+class SyntheticSource(FrameSource):
+    """A bright hand-sized blob sweeping left to right, shown every other pass."""
+
+    name = "synthetic"
+
+    def __init__(self, size=SYNTHETIC_SIZE, fps=DEFAULT_SOURCE_FPS, realtime=True, loop=True,
+                 frames=None):
+        super().__init__(fps, realtime, loop)
+        self.size = size
+        self.frames = frames
+        w, h = size
+        self._blank = np.full((h, w, 3), 24, np.uint8)
+        self._blob = (w // 8, h * 2 // 5)
+
+    def length(self):
+        return self.frames
+
+    def _frame(self, index):
+        w, h = self.size
+        bw, bh = self._blob
+        frame = self._blank.copy()
+        phase = (index / self.fps) % (2.0 * SYNTHETIC_SWIPE_SECONDS)
+        if phase < SYNTHETIC_SWIPE_SECONDS:
+            # camera view is mirrored by the backends, so move right-to-left here
+            x = int((1.0 - phase / SYNTHETIC_SWIPE_SECONDS) * (w - bw))
+            y = (h - bh) // 2
+            frame[y:y + bh, x:x + bw] = (180, 200, 220)
+        return frame
+
+
+def open_frame_source(spec, size=None, realtime=True, loop=True):
+    """Open a source from a spec string.
+
+    "" or a number -> camera index, "synthetic[:WxH]" -> generated frames,
+    a directory -> its images, an existing file -> that clip, anything else is
+    handed to cv2.VideoCapture (e.g. an rtsp:// URL). `size` is only a request
+    to cameras; file frames keep their own resolution.
+    """
+    spec = (spec or "0").strip()
+    if spec.isdigit():
+        return CameraSource(int(spec), size)
+    if spec == "synthetic" or spec.startswith("synthetic:"):
+        syn_size = SYNTHETIC_SIZE
+        if ":" in spec:
+            w, h = spec.split(":", 1)[1].lower().split("x")
+            syn_size = (int(w), int(h))
+        return SyntheticSource(syn_size, realtime=realtime, loop=loop)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, realtime=realtime, loop=loop)
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, realtime=realtime, loop=loop)
+    return CameraSource(spec, size)
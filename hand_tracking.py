@@ -0,0 +1,462 @@
+# Hand tracking helpers shared by the camera code in main.py
+#
+# AdaptiveInferenceScheduler decides per camera frame whether the expensive
+# MediaPipe pass has to run. A cheap motion-energy check on a tiny grayscale
+# copy of the frame catches any movement (so swipes still get full-rate
+# inference), otherwise inference only runs every few frames while a hand is
+# visible and much more rarely while the scene is idle.
+#
+# HandPredictor fills the skipped frames by extrapolating hand_y / hand_width /
+# hand_center_x with a damped constant-velocity model.
+#
+# GestureRecognizer replaces one-frame differences with a streaming temporal
+# classifier: landmarks go through a vectorized One Euro filter into a NumPy
+# ring buffer of timestamped frames, and swipes / waves are classified from the
+# palm velocity over a time window, so the result no longer depends on the
+# camera frame rate.
+#
+# Gesture backends turn a raw BGR camera frame into hand observations
+# (label, center_x, center_y, width, score) in mirrored, normalized [0, 1]
+# coordinates, so main.py can drive the game from any of them:
+#   MediaPipeBackend - 21-landmark hand tracking (accurate, heavy)
+#   MotionBackend    - OpenCV-only frame differencing on a downscaled frame
+#                      (cheap enough for one low-end core at camera rate)
+
+import math
+
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Scheduler tuning
+MOTION_SIZE = (80, 60)        # downscaled grayscale frame used for motion energy
+MOTION_THRESHOLD = 4.0        # mean absolute pixel difference (0..255) that counts as movement
+INFER_EVERY_ACTIVE = 3        # max frames between inferences while a hand is tracked
+INFER_EVERY_IDLE = 15         # max frames between inferences with no hand and no motion
+
+# Predictor tuning
+PREDICT_HORIZON = 0.15        # seconds; never extrapolate further than this
+VELOCITY_SMOOTHING = 0.5      # 0..1, weight of the newest velocity estimate
+
+
+class AdaptiveInferenceScheduler:
+    """Run inference every N frames, or immediately when the frame changes."""
+
+    def __init__(self, every_active=INFER_EVERY_ACTIVE, every_idle=INFER_EVERY_IDLE,
+                 motion_threshold=MOTION_THRESHOLD):
+        self.every_active = max(1, every_active)
+        self.every_idle = max(1, every_idle)
+        self.motion_threshold = motion_threshold
+        self.hand_present = False
+        self.frames_since_inference = 0
+        self.last_motion = 0.0
+        self.inferences = 0
+        self.frames = 0
+        self._prev_small = None
+
+    def motion_energy(self, frame_bgr):
+        small = cv2.resize(frame_bgr, MOTION_SIZE, interpolation=cv2.INTER_AREA)
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        prev, self._prev_small = self._prev_small, small
+        if prev is None:
+            return float("inf")
+        return float(cv2.absdiff(small, prev).mean())
+
+    def should_infer(self, frame_bgr):
+        self.frames += 1
+        self.frames_since_inference += 1
+        self.last_motion = self.motion_energy(frame_bgr)
+        every = self.every_active if self.hand_present else self.every_idle
+        run = self.last_motion >= self.motion_threshold or self.frames_since_inference >= every
+        if run:
+            self.frames_since_inference = 0
+            self.inferences += 1
+        return run
+
+    def inference_ratio(self):
+        return self.inferences / self.frames if self.frames else 1.0
+
+
+class HandPredictor:
+    """Damped constant-velocity extrapolation of (hand_y, hand_width, hand_center_x)."""
+
+    def __init__(self):
+        self.values = None
+        self.velocity = (0.0, 0.0, 0.0)
+        self.t = 0.0
+
+    def observe(self, t, values):
+        if self.values is not None and t > self.t:
+            dt = t - self.t
+            a = VELOCITY_SMOOTHING
+            self.velocity = tuple(a * (v - p) / dt + (1 - a) * ov
+                                  for v, p, ov in zip(values, self.values, self.velocity))
+        else:
+            self.velocity = (0.0, 0.0, 0.0)
+        self.values = tuple(values)
+        self.t = t
+
+    def lost(self):
+        self.values = None
+        self.velocity = (0.0, 0.0, 0.0)
+
+    def predict(self, t):
+        """Extrapolated values at time t, or None if the hand is not tracked."""
+        if self.values is None:
+            return None
+        dt = min(max(0.0, t - self.t), PREDICT_HORIZON)
+        return tuple(v + dv * dt for v, dv in zip(self.values, self.velocity))
+
+
+# One Euro filter tuning (coordinates are normalized to [0, 1])
+ONE_EURO_MIN_CUTOFF = 1.0     # Hz; jitter suppression when the hand is still
+ONE_EURO_BETA = 10.0          # cutoff increase per unit/s of speed (less lag on fast moves)
+ONE_EURO_D_CUTOFF = 1.0       # Hz; smoothing of the speed estimate
+
+# Recognizer tuning
+GESTURE_RING_SIZE = 128       # frames kept (about 2 s at 60 fps)
+PALM_LANDMARKS = (0, 5, 9, 13, 17)  # wrist + finger bases: steadier than the bbox center
+SWIPE_WINDOW = 0.25           # seconds of history a swipe is measured over
+SWIPE_DISTANCE = 0.12         # min net horizontal travel (fraction of frame width)
+SWIPE_SPEED = 0.6             # min mean horizontal speed (frame widths per second)
+SWIPE_HOLD = 0.25             # a swipe must have no fast reverse stroke this long before and after it
+WAVE_WINDOW = 1.6             # seconds of history a wave is measured over (3 reversals at 1 Hz)
+WAVE_REVERSALS = 3            # direction changes needed for a wave
+WAVE_SPEED = 0.3              # strokes slower than this do not count
+WAVE_AMPLITUDE = 0.06         # min horizontal range of the waving hand
+GESTURE_REFRACTORY = 0.3      # seconds before the same gesture can fire again
+
+
+class OneEuroFilter:
+    """One Euro low-pass filter applied elementwise to arrays of any shape."""
+
+    def __init__(self, min_cutoff=ONE_EURO_MIN_CUTOFF, beta=ONE_EURO_BETA, d_cutoff=ONE_EURO_D_CUTOFF):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = 0.0
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, t, x):
+        x = np.asarray(x, dtype=np.float32)
+        if self._x is None or x.shape != self._x.shape:
+            self._x = x.copy()
+            self._dx = np.zeros_like(x)
+            self._t = t
+            return self._x
+        dt = t - self._t
+        if dt <= 0.0:
+            return self._x
+        self._t = t
+        a_d = self._alpha(dt, self.d_cutoff)
+        self._dx += a_d * ((x - self._x) / dt - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        a = 1.0 / (1.0 + 1.0 / (2.0 * math.pi * cutoff * dt))
+        self._x += a * (x - self._x)
+        return self._x
+
+
+Gesture = namedtuple("Gesture", "kind t dx dy speed")
+
+
+class GestureRecognizer:
+    """Classify swipes and waves from a ring buffer of filtered hand keypoints.
+
+    push() takes the (K, 2) normalized keypoints of one hand (21 MediaPipe
+    landmarks, or a single centroid from backends without landmarks); poll()
+    returns at most one Gesture per movement.
+
+    A stroke that looks like a swipe is held back for SWIPE_HOLD: if the hand
+    turns around fast within that time (or had just come the other way) the
+    stroke is part of a wave, not a swipe. Swipes never clear the history, so
+    the strokes of a wave keep counting towards it.
+    """
+
+    def __init__(self, size=GESTURE_RING_SIZE):
+        self.size = size
+        self.filter = OneEuroFilter()
+        self.t = np.full(size, -np.inf)
+        self.anchor = np.zeros((size, 2), dtype=np.float32)
+        self.head = 0          # next slot to write
+        self.count = 0
+        self.last_kind = None
+        self.quiet_until = -np.inf
+        self.stroke = 0        # direction of the swipe stroke still in progress (0 = none)
+        self.swipe_from = -np.inf  # samples before this belong to an earlier swipe stroke
+        self.pending = None    # (detected at, stroke start, Gesture) swipe held back for SWIPE_HOLD
+        self._order = np.arange(size)
+        self._fresh = False    # a sample arrived since the last poll()
+
+    def reset(self):
+        self.filter.reset()
+        self.t[:] = -np.inf
+        self.count = 0
+        self.stroke = 0
+        self.swipe_from = -np.inf
+        self.pending = None
+
+    def push(self, t, keypoints):
+        pts = self.filter(t, keypoints)
+        if len(pts) == 21:
+            anchor = pts[PALM_LANDMARKS, :2].mean(axis=0)
+        else:
+            anchor = pts[:, :2].mean(axis=0)
+        self.t[self.head] = t
+        self.anchor[self.head] = anchor
+        self.head = (self.head + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        self._fresh = True
+
+    def _window(self, now, seconds):
+        """Chronological (t, anchor) arrays for samples newer than now - seconds."""
+        idx = (self._order + self.head) % self.size
+        t = self.t[idx]
+        keep = t >= now - seconds
+        return t[keep], self.anchor[idx[keep]]
+
+    def poll(self, now):
+        # without a new sample the answer cannot change (skipped inference frames)
+        if not self._fresh:
+            return None
+        self._fresh = False
+        if self.count < 3:
+            return None
+        t, xy = self._window(now, WAVE_WINDOW)
+        if len(t) < 3:
+            return None
+        dt = np.diff(t)
+        dt[dt <= 0.0] = 1e-3
+        vx = np.diff(xy[:, 0]) / dt
+
+        # wave: several fast direction reversals with a visible amplitude
+        strokes = np.sign(vx[np.abs(vx) >= WAVE_SPEED])
+        reversals = int(np.count_nonzero(strokes[1:] != strokes[:-1]))
+        amplitude = float(xy[:, 0].max() - xy[:, 0].min())
+        if reversals >= WAVE_REVERSALS and amplitude >= WAVE_AMPLITUDE:
+            self.pending = None
+            return self._emit("wave", now, amplitude, 0.0, float(np.abs(vx).mean()))
+        if reversals >= WAVE_REVERSALS - 1:
+            # a waving hand: single strokes are not swipes
+            self.pending = None
+            return None
+
+        if self.pending is not None:
+            detected, start, gesture = self.pending
+            direction = 1.0 if gesture.dx > 0 else -1.0
+            if np.any(direction * vx[t[1:] > start] < -WAVE_SPEED):
+                # the hand turned around: a wave stroke, and no other swipe in it
+                self.pending = None
+                self.swipe_from = t[-1]
+                return None
+            if now - detected < SWIPE_HOLD:
+                return None
+            self.pending = None
+            return self._emit(gesture.kind, now, gesture.dx, gesture.dy, gesture.speed)
+
+        # a swipe fires once per stroke: wait until the hand stops or turns
+        if self.stroke:
+            if abs(vx[-1]) < WAVE_SPEED or np.sign(vx[-1]) != self.stroke:
+                # stroke over: a new swipe may only use samples from here on
+                self.stroke = 0
+                self.swipe_from = t[-1]
+            return None
+
+        # swipe: net horizontal travel over a short window without a reversal
+        recent = t >= max(now - SWIPE_WINDOW, self.swipe_from)
+        if np.count_nonzero(recent) < 2:
+            return None
+        first = int(np.argmax(recent))
+        span = float(t[-1] - t[first])
+        if span <= 0.0:
+            return None
+        dx = float(xy[-1, 0] - xy[first, 0])
+        dy = float(xy[-1, 1] - xy[first, 1])
+        speed = abs(dx) / span
+        # no fast movement the other way inside the window or just before it
+        # (rules out wave strokes, including the last one of a wave)
+        before = t[1:] > t[first] - SWIPE_HOLD
+        steady = not np.any(np.sign(dx) * vx[before] < -WAVE_SPEED)
+        if abs(dx) >= SWIPE_DISTANCE and speed >= SWIPE_SPEED and abs(dx) > 2.0 * abs(dy) and steady:
+            kind = "swipe_right" if dx > 0 else "swipe_left"
+            self.pending = (now, float(t[first]), Gesture(kind, now, dx, dy, speed))
+        return None
+
+    def _emit(self, kind, now, dx, dy, speed):
+        if kind == self.last_kind and now < self.quiet_until:
+            return None
+        self.last_kind = kind
+        if kind == "wave":
+            self.quiet_until = now + WAVE_WINDOW
+        else:
+            # the stroke that produced this swipe must not be classified again
+            self.quiet_until = now + GESTURE_REFRACTORY
+            self.stroke = 1 if dx > 0 else -1
+        return Gesture(kind, now, dx, dy, speed)
+
+
+class GestureBackend:
+    """Interface for hand sources used by the camera branch of the game loop."""
+
+    name = "base"
+    # whether AdaptiveInferenceScheduler is worth running in front of process()
+    expensive = False
+
+    def process(self, frame_bgr):
+        """Return [(label, center_x, center_y, width, score), ...] (normalized, mirrored)."""
+        raise NotImplementedError
+
+    def keypoints(self):
+        """(K, 2) normalized keypoints per hand of the last process() call, same
+        order as its observations; empty if the backend only has centroids."""
+        return []
+
+    def debug_image(self, frame_bgr):
+        """Mirrored BGR frame with this backend's last result drawn on it."""
+        return cv2.flip(frame_bgr, 1)
+
+    def close(self):
+        pass
+
+
+class MediaPipeBackend(GestureBackend):
+    name = "mediapipe"
+    expensive = True
+
+    def __init__(self, max_hands=1):
+        import mediapipe as mp
+        self.mp_hands = mp.solutions.hands
+        self.mp_drawing = mp.solutions.drawing_utils
+        # create a persistent Hands object for efficiency
+        self.hands = self.mp_hands.Hands(static_image_mode=False,
+                                         max_num_hands=max_hands,
+                                         min_detection_confidence=0.5,
+                                         min_tracking_confidence=0.5)
+        self.last_flipped = None
+        self.last_results = None
+
+    def process(self, frame_bgr):
+        # Flip and convert to RGB for MediaPipe
+        frame_flipped = cv2.flip(frame_bgr, 1)
+        frame_rgb = cv2.cvtColor(frame_flipped, cv2.COLOR_BGR2RGB)
+        results = self.hands.process(frame_rgb)
+        self.last_flipped = frame_flipped
+        self.last_results = results
+        return self.observations(results)
+
+    def observations(self, results):
+        """Hand bounding boxes of a hands.process() result as observations."""
+        observations = []
+        if results.multi_hand_landmarks:
+            for hi, lm in enumerate(results.multi_hand_landmarks):
+                # Use bounding box of landmarks to compute hand_y and hand_width
+                xs = [p.x for p in lm.landmark]
+                ys = [p.y for p in lm.landmark]
+                x_min, x_max = min(xs), max(xs)
+                y_min, y_max = min(ys), max(ys)
+                label, score = None, 0.0
+                if results.multi_handedness and hi < len(results.multi_handedness):
+                    cls = results.multi_handedness[hi].classification[0]
+                    label, score = cls.label, float(cls.score)
+                observations.append((label, (x_min + x_max) / 2.0, (y_min + y_max) / 2.0,
+                                     x_max - x_min, score))
+        return observations
+
+    def landmarks(self):
+        """Landmark lists from the last process() call (for richer recognizers)."""
+        if self.last_results is None or not self.last_results.multi_hand_landmarks:
+            return []
+        return self.last_results.multi_hand_landmarks
+
+    def keypoints(self):
+        return [np.array([(p.x, p.y) for p in lm.landmark], dtype=np.float32)
+                for lm in self.landmarks()]
+
+    def debug_image(self, frame_bgr):
+        debug_frame = (self.last_flipped if self.last_flipped is not None else cv2.flip(frame_bgr, 1)).copy()
+        for lm in self.landmarks():
+            self.mp_drawing.draw_landmarks(debug_frame, lm, self.mp_hands.HAND_CONNECTIONS)
+        return debug_frame
+
+    def close(self):
+        try:
+            self.hands.close()
+        except Exception:
+            pass
+
+
+# MotionBackend tuning
+MOTION_BACKEND_SIZE = (160, 120)   # processing resolution
+MOTION_DIFF_THRESHOLD = 18         # per-pixel gray difference that counts as motion
+MOTION_DECAY = 0.6                 # motion history decay per frame (keeps a moving hand "lit")
+MOTION_MIN_AREA = 0.01             # min blob area as a fraction of the frame
+
+
+class MotionBackend(GestureBackend):
+    """OpenCV-only hand stand-in: the largest moving blobs in a tiny mirrored frame.
+
+    Frame differencing feeds a decaying motion-history image; connected
+    components of the thresholded history give centroid and bbox width for up
+    to `max_hands` blobs. Everything runs at 160x120, so it costs well under a
+    millisecond per frame.
+    """
+
+    name = "motion"
+
+    def __init__(self, max_hands=1):
+        self.max_hands = max_hands
+        self._prev = None
+        self._history = None
+        self._kernel = np.ones((3, 3), np.uint8)
+        self._last_boxes = []
+
+    def process(self, frame_bgr):
+        small = cv2.resize(frame_bgr, MOTION_BACKEND_SIZE, interpolation=cv2.INTER_AREA)
+        small = cv2.flip(small, 1)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+        prev, self._prev = self._prev, gray
+        if prev is None:
+            self._history = np.zeros_like(gray, dtype=np.float32)
+            return []
+        diff = cv2.absdiff(gray, prev).astype(np.float32)
+        np.maximum(self._history * MOTION_DECAY, diff, out=self._history)
+        mask = (self._history > MOTION_DIFF_THRESHOLD).astype(np.uint8)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+        mask = cv2.dilate(mask, self._kernel, iterations=2)
+        n, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        w, h = MOTION_BACKEND_SIZE
+        min_area = MOTION_MIN_AREA * w * h
+        blobs = [i for i in range(1, n) if stats[i, cv2.CC_STAT_AREA] >= min_area]
+        blobs.sort(key=lambda i: stats[i, cv2.CC_STAT_AREA], reverse=True)
+        observations = []
+        self._last_boxes = []
+        for i in blobs[:self.max_hands]:
+            bx, by, bw, bh = stats[i, :4]
+            cx, cy = centroids[i]
+            score = min(1.0, stats[i, cv2.CC_STAT_AREA] / (0.1 * w * h))
+            observations.append((None, cx / w, cy / h, bw / w, float(score)))
+            self._last_boxes.append((bx / w, by / h, bw / w, bh / h))
+        return observations
+
+    def debug_image(self, frame_bgr):
+        debug_frame = cv2.flip(frame_bgr, 1)
+        fh, fw = debug_frame.shape[:2]
+        for bx, by, bw, bh in self._last_boxes:
+            cv2.rectangle(debug_frame, (int(bx * fw), int(by * fh)),
+                          (int((bx + bw) * fw), int((by + bh) * fh)), (0, 200, 255), 2)
+        return debug_frame
+
+
+GESTURE_BACKENDS = {
+    "mediapipe": MediaPipeBackend,
+    "motion": MotionBackend,
+}
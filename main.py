@@ -5,16 +5,20 @@ import time
 import threading
 import sys
 import random
+from array import array
 
 # Optional camera/mediapipe imports (guarded)
-USE_MEDIAPIPE = False
+HAVE_CV2 = False
+HAVE_MEDIAPIPE = False
 try:
     import cv2
-    import mediapipe as mp
-    USE_MEDIAPIPE = True
+    HAVE_CV2 = True
+    import mediapipe as mp  # noqa: F401
+    HAVE_MEDIAPIPE = True
 except Exception:
-    # mediapipe / opencv not available; will use simulated hand
-    USE_MEDIAPIPE = False
+    # mediapipe / opencv not available; the motion backend or simulated hand is used
+    pass
+USE_CAMERA = False  # True once a camera and a gesture backend are running
 
 # Simple Pygame demo based on user's snippet
 # This demo shows moving "stairs" (rectangles) and a player that jumps horizontally
@@ -66,9 +70,61 @@ AUTOPLAY_INTERVAL = 0.55
 _gif_writer = None
 _record_end_time = None
 _last_autoplay_time = 0.0
+# Deterministic replay / snapshot options
+SIM_SEED = None            # seed for `random` (fireworks); None keeps it unseeded
+SNAPSHOT_DUMP_PATH = None  # if set, dump the snapshot ring here on exit
+NUM_PLAYERS = 1            # 2 = two avatars on parallel stair tracks
+# Shared-memory frame export (see frame_export.py)
+EXPORT_SHM_NAME = None     # e.g. --export-shm=game_demo_frames
+EXPORT_SHM_SLOTS = 3
+# Session telemetry (see telemetry.py); None keeps it off
+TELEMETRY_PATH = None      # --telemetry[=PATH]
+# Fleet monitoring metrics in Prometheus text format (see metrics.py)
+METRICS_PATH = None        # --metrics=PATH rewrites a text file every interval
+METRICS_PORT = None        # --metrics-port=N serves http://127.0.0.1:N/metrics
+METRICS_INTERVAL = 10.0    # --metrics-interval=SECONDS
+# Adaptive MediaPipe scheduling (see hand_tracking.py)
+ADAPTIVE_INFERENCE = True  # --no-adaptive-inference runs hands.process every frame
+INFER_EVERY = 3            # --infer-every=N: max frames between inferences while a hand is visible
+# Pixel-art render target: draw the scene at 1/RENDER_SCALE resolution, then
+# integer-upscale it to the window in one pass (HUD text stays native)
+RENDER_SCALE = 1           # --pixel-scale=2 -> 400x300, --pixel-scale=4 -> 200x150
+# the low-res surface must tile the window exactly: 1, 2, 4, 5, 8 for 800x600
+PIXEL_SCALES = [s for s in range(1, 9) if SCREEN_W % s == 0 and SCREEN_H % s == 0]
+HAZARD_COUNT = 0           # --hazards=N moving hazards (see entities.py)
+PICKUP_COUNT = 0           # --pickups=N coins / shields
+# Gesture backend: auto (mediapipe if installed, else motion), mediapipe,
+# motion (OpenCV-only frame differencing) or simulated (no camera)
+GESTURE_BACKEND = "auto"
+# Frame source for the gesture backend (see frame_sources.py): a camera index,
+# a video file, an image directory or "synthetic"
+CAMERA_SOURCE = "0"
+# Idle power mode: static screens (title, game over, finished victory) are drawn
+# once and then the loop blocks in pygame.event.wait until input arrives
+IDLE_POWER = True          # --no-idle-power redraws them every frame as before
+IDLE_WAIT_MS = 500         # wake-up interval while idle
+# Player sprite animation (see sprite_anim.py): squash/stretch, arc lean,
+# mirroring and neon outlines from a cache of pre-transformed frames
+SPRITE_FX = True           # --no-sprite-fx draws the key sprites untransformed
+# Soak mode (see soak.py): autoplay title -> round -> result -> title in a loop
+SOAK_HOURS = None          # --soak[=HOURS]; 0 runs until ESC
+SOAK_INTERVAL = 60.0       # --soak-interval=SECONDS between memory / frame-time reports
+SOAK_REPORT_PATH = "soak_report.jsonl"  # --soak-report=PATH
+# Input traces and offline replay (see replay.py)
+RECORD_TRACE_PATH = None   # --record-trace=PATH writes key presses + hand signals
+REPLAY_PATH = None         # --replay=PATH plays a trace headless on a fixed timestep
+REPLAY_FPS = 60            # --replay-fps=N
+REPLAY_FRAMES = (0, None)  # --replay-frames=START:END, only these frames are drawn
+REPLAY_OUT = None          # --replay-out=PATH encodes the drawn frames (mp4 / gif)
 
 def _parse_cli():
     global RECORD_GIF, RECORD_PATH, RECORD_FPS, RECORD_SECONDS, AUTO_PLAY
+    global SIM_SEED, SNAPSHOT_DUMP_PATH, NUM_PLAYERS
+    global EXPORT_SHM_NAME, EXPORT_SHM_SLOTS, TELEMETRY_PATH
+    global METRICS_PATH, METRICS_PORT, METRICS_INTERVAL
+    global ADAPTIVE_INFERENCE, INFER_EVERY, RENDER_SCALE, HAZARD_COUNT, PICKUP_COUNT
+    global GESTURE_BACKEND, CAMERA_SOURCE, IDLE_POWER, SPRITE_FX, SOAK_HOURS, SOAK_INTERVAL, SOAK_REPORT_PATH
+    global RECORD_TRACE_PATH, REPLAY_PATH, REPLAY_FPS, REPLAY_FRAMES, REPLAY_OUT
     # Light argument parser to avoid adding argparse
     args = sys.argv[1:]
     for a in list(args):
@@ -87,8 +143,148 @@ def _parse_cli():
                 pass
         elif a == "--autoplay":
             AUTO_PLAY = True
+        elif a.startswith("--seed="):
+            try:
+                SIM_SEED = int(a.split("=", 1)[1])
+            except Exception:
+                pass
+        elif a.startswith("--snapshot-dump="):
+            SNAPSHOT_DUMP_PATH = a.split("=", 1)[1]
+        elif a == "--export-shm":
+            EXPORT_SHM_NAME = "game_demo_frames"
+        elif a.startswith("--export-shm="):
+            EXPORT_SHM_NAME = a.split("=", 1)[1]
+        elif a.startswith("--export-slots="):
+            try:
+                EXPORT_SHM_SLOTS = max(2, int(a.split("=", 1)[1]))
+            except Exception:
+                pass
+        elif a == "--telemetry":
+            TELEMETRY_PATH = ""  # empty -> telemetry.DEFAULT_DB_PATH
+        elif a.startswith("--telemetry="):
+            TELEMETRY_PATH = a.split("=", 1)[1]
+        elif a.startswith("--metrics="):
+            METRICS_PATH = a.split("=", 1)[1]
+        elif a.startswith("--metrics-port="):
+            try:
+                METRICS_PORT = int(a.split("=", 1)[1])
+            except Exception:
+                pass
+        elif a.startswith("--metrics-interval="):
+            try:
+                METRICS_INTERVAL = max(1.0, float(a.split("=", 1)[1]))
+            except Exception:
+                pass
+        elif a == "--no-adaptive-inference":
+            ADAPTIVE_INFERENCE = False
+        elif a.startswith("--infer-every="):
+            try:
+                INFER_EVERY = max(1, int(a.split("=", 1)[1]))
+            except Exception:
+                pass
+        elif a.startswith("--pixel-scale="):
+            try:
+                requested = int(a.split("=", 1)[1])
+                RENDER_SCALE = max([s for s in PIXEL_SCALES if s <= requested] or [1])
+                if RENDER_SCALE != requested:
+                    print(f"--pixel-scale={requested} unsupported for {SCREEN_W}x{SCREEN_H}; "
+                          f"using {RENDER_SCALE} (choose from {', '.join(map(str, PIXEL_SCALES))})")
+            except Exception:
+                pass
+        elif a.startswith("--hazards="):
+            try:
+                HAZARD_COUNT = max(0, int(a.split("=", 1)[1]))
+            except Exception:
+                pass
+        elif a.startswith("--pickups="):
+            try:
+                PICKUP_COUNT = max(0, int(a.split("=", 1)[1]))
+            except Exception:
+                pass
+        elif a.startswith("--gesture-backend="):
+            GESTURE_BACKEND = a.split("=", 1)[1].strip().lower()
+        elif a.startswith("--camera="):
+            CAMERA_SOURCE = a.split("=", 1)[1]
+        elif a == "--no-idle-power":
+            IDLE_POWER = False
+        elif a == "--no-sprite-fx":
+            SPRITE_FX = False
+        elif a == "--soak":
+            SOAK_HOURS = 0.0
+        elif a.startswith("--soak="):
+            try:
+                SOAK_HOURS = max(0.0, float(a.split("=", 1)[1]))
+            except Exception:
+                SOAK_HOURS = 0.0
+        elif a.startswith("--soak-interval="):
+            try:
+                SOAK_INTERVAL = max(1.0, float(a.split("=", 1)[1]))
+            except Exception:
+                pass
+        elif a.startswith("--soak-report="):
+            SOAK_REPORT_PATH = a.split("=", 1)[1] or None
+        elif a.startswith("--record-trace="):
+            RECORD_TRACE_PATH = a.split("=", 1)[1]
+        elif a.startswith("--replay="):
+            REPLAY_PATH = a.split("=", 1)[1]
+        elif a.startswith("--replay-fps="):
+            try:
+                REPLAY_FPS = max(1, int(a.split("=", 1)[1]))
+            except Exception:
+                pass
+        elif a.startswith("--replay-frames="):
+            try:
+                start, end = a.split("=", 1)[1].split(":")
+                REPLAY_FRAMES = (int(start or 0), int(end) if end else None)
+            except Exception:
+                pass
+        elif a.startswith("--replay-out="):
+            REPLAY_OUT = a.split("=", 1)[1]
+        elif a.startswith("--players="):
+            try:
+                NUM_PLAYERS = max(1, min(2, int(a.split("=", 1)[1])))
+            except Exception:
+                pass
 
 _parse_cli()
+
+# Simulation clock: wall time in a live run; during --replay the replayer sets
+# it and it advances exactly 1/REPLAY_FPS per frame
+_sim_now = None
+
+
+def sim_time():
+    return time.time() if _sim_now is None else _sim_now
+
+
+replayer = None
+# skip the title screen and start the first round immediately (GIF recording,
+# and replays of traces recorded that way)
+AUTO_START = RECORD_GIF
+if REPLAY_PATH:
+    import replay as _replay_mod
+    replayer = _replay_mod.TraceReplayer(REPLAY_PATH, REPLAY_FPS, *REPLAY_FRAMES)
+    # gameplay options come from the trace; replays are headless and unthrottled
+    SIM_SEED = replayer.header.get("seed")
+    NUM_PLAYERS = replayer.header.get("players", 1)
+    HAZARD_COUNT = replayer.header.get("hazards", 0)
+    PICKUP_COUNT = replayer.header.get("pickups", 0)
+    AUTO_PLAY = replayer.header.get("autoplay", False)
+    AUTO_START = replayer.header.get("autostart", False)
+    GESTURE_BACKEND = "simulated"
+    IDLE_POWER = False
+    RECORD_GIF = False
+    RECORD_TRACE_PATH = None
+    TELEMETRY_PATH = None
+    SOAK_HOURS = None
+    _sim_now = replayer.t0
+elif RECORD_TRACE_PATH and SIM_SEED is None:
+    # a trace is only reproducible together with its seed
+    SIM_SEED = random.randrange(1 << 31)
+if SOAK_HOURS is not None:
+    AUTO_PLAY = True
+if SIM_SEED is not None:
+    random.seed(SIM_SEED)
 # Optional title image shown on the start/pause screen
 TITLE_IMG_PATH = "/Users/liyuwen/Documents/副本标题.png"
 title_image = None
@@ -320,6 +516,63 @@ except Exception:
 jump_threshold = 200  # pixel threshold for hand_y to trigger a jump
 invert_hand_y = False  # if True, invert camera Y mapping (so lower hand -> smaller value)
 
+# Session telemetry: events are queued here and written by a background thread
+telemetry = None
+if TELEMETRY_PATH is not None:
+    try:
+        import telemetry as _telemetry_mod
+        telemetry = _telemetry_mod.Telemetry(TELEMETRY_PATH or _telemetry_mod.DEFAULT_DB_PATH)
+        telemetry.log("session_start", players=NUM_PLAYERS, autoplay=AUTO_PLAY)
+    except Exception as e:
+        print("Telemetry unavailable:", e)
+        telemetry = None
+
+# Fleet monitoring metrics: counters/histograms updated in place on the game
+# thread, rendered and exported by a background thread (file and/or localhost HTTP)
+game_metrics = None
+metrics_exporter = None
+if METRICS_PATH or METRICS_PORT is not None:
+    try:
+        import metrics as _metrics_mod
+        game_metrics = _metrics_mod.GameMetrics()
+        _reg = game_metrics.registry
+        # read on the exporter thread when rendering, never per frame
+        _reg.gauge("game_particles", "Live effect particles", fn=lambda: len(confetti_particles), kind="confetti")
+        _reg.gauge("game_particles", fn=lambda: len(firework_rockets), kind="rocket")
+        _reg.gauge("game_entities", "Live hazards and power-ups",
+                   fn=lambda: entity_store.count() if entity_store is not None else 0)
+        _reg.gauge("game_players", "Players configured").set(NUM_PLAYERS)
+        _reg.gauge("game_camera_active", "1 while a camera gesture backend is running", fn=lambda: int(USE_CAMERA))
+        metrics_exporter = _metrics_mod.MetricsExporter(game_metrics, METRICS_PATH, METRICS_PORT, METRICS_INTERVAL)
+        if METRICS_PORT is not None:
+            print(f"Metrics: http://127.0.0.1:{METRICS_PORT}/metrics")
+    except Exception as e:
+        print("Metrics unavailable:", e)
+        game_metrics = None
+        metrics_exporter = None
+
+
+# Input trace for offline replay (python replay.py TRACE OUT)
+trace_recorder = None
+if RECORD_TRACE_PATH:
+    try:
+        import replay as _replay_mod
+        trace_recorder = _replay_mod.TraceRecorder(RECORD_TRACE_PATH, sim_time(), seed=SIM_SEED,
+                                                   players=NUM_PLAYERS, hazards=HAZARD_COUNT,
+                                                   pickups=PICKUP_COUNT, autoplay=AUTO_PLAY,
+                                                   autostart=AUTO_START)
+    except Exception as e:
+        print("Trace recording unavailable:", e)
+        trace_recorder = None
+
+
+def log_event(kind, **fields):
+    if telemetry is not None:
+        telemetry.log(kind, **fields)
+    if game_metrics is not None:
+        game_metrics.event(kind, **fields)
+
+
 # helper to reset player to configured start (on current lowest stair)
 def reset_player_to_start():
     global player_x, player_y, parallax_origin_x, parallax_offset_x
@@ -344,11 +597,17 @@ def reset_player_to_start():
     parallax_offset_x = 0.0
 
 
-def draw_start_platform(dst):
+def to_view(v):
+    """Convert a game-space coordinate/length to the (possibly low-res) world surface."""
+    return int(v) // RENDER_SCALE
+
+
+def draw_start_platform(dst, offset_y=0):
+    pos = (to_view(START_PLATFORM_X), to_view(START_PLATFORM_Y + offset_y))
     if start_platform_image is not None:
-        dst.blit(start_platform_image, (int(START_PLATFORM_X), int(START_PLATFORM_Y)))
+        dst.blit(start_platform_image, pos)
     else:
-        pygame.draw.rect(dst, (40, 120, 240), (int(START_PLATFORM_X), int(START_PLATFORM_Y), START_PLATFORM_W, START_PLATFORM_H))
+        pygame.draw.rect(dst, (40, 120, 240), (pos[0], pos[1], to_view(START_PLATFORM_W), to_view(START_PLATFORM_H)))
 
 
 def schedule_jump_to_stair(index, strength_value):
@@ -365,10 +624,11 @@ def schedule_jump_to_stair(index, strength_value):
     anim_start_y = player_y
     anim_target_x = target_x
     anim_target_y = target_y
-    anim_start_time = time.time()
+    anim_start_time = sim_time()
     pending_target_index = index
     last_jump_distance = strength_value
     last_gesture_time = anim_start_time
+    log_event("jump", player=1, target=index, strength=round(float(strength_value), 1))
     try:
         if jump_sound is not None:
             jump_sound.play()
@@ -410,28 +670,59 @@ sprite_air = load_sprite_scaled(SPRITE_PATH_AIR, SPRITE_TARGET_H)
 SPRITE_FOOT_OFFSET = 0  # disabled: keep true center alignment
 
 def get_player_sprite():
+    return pick_sprite(is_animating_jump, render_jump_progress, is_falling)
+
+def pick_sprite(animating, progress, falling):
     # choose sprite based on animation/fall state
-    if is_animating_jump:
-        p = render_jump_progress if render_jump_progress is not None else 0.0
+    if animating:
+        p = progress if progress is not None else 0.0
         if p < 0.2:
             return sprite_jump or sprite_air or sprite_idle
         elif p < 0.85:
             return sprite_air or sprite_jump or sprite_idle
         else:
             return sprite_land or sprite_air or sprite_idle
-    if is_falling:
+    if falling:
         return sprite_air or sprite_jump or sprite_idle
     return sprite_idle
 
+def facing(start_x, target_x):
+    """+1 / -1: the direction of the last jump (the key sprites face right)."""
+    return -1 if target_x < start_x else 1
+
+def animated_sprite(img, animating, progress, falling, face, color):
+    """Cached squash/stretch/lean/mirror/glow frame for a key sprite."""
+    if sprite_cache is None:
+        return img
+    return sprite_cache.get(img, *sprite_anim.player_pose(animating, progress, falling, face), face < 0, color)
+
 def draw_player(dst):
     img = get_player_sprite()
     if img is not None:
+        img = animated_sprite(img, is_animating_jump, render_jump_progress, is_falling,
+                              facing(anim_start_x, anim_target_x), player_color)
         # render exactly centered at (player_x, player_y)
-        rect = img.get_rect(center=(int(player_x), int(player_y)))
+        rect = img.get_rect(center=(to_view(player_x), to_view(player_y)))
         dst.blit(img, rect)
     else:
         # fallback to the circle if sprites missing
-        pygame.draw.circle(dst, player_color, (int(player_x), int(player_y)), player_radius)
+        pygame.draw.circle(dst, player_color, (to_view(player_x), to_view(player_y)), max(1, to_view(player_radius)))
+
+def draw_player2(dst):
+    p = player2
+    img = pick_sprite(p["is_animating_jump"], p["render_jump_progress"], p["is_falling"])
+    if img is not None:
+        img = animated_sprite(img, p["is_animating_jump"], p["render_jump_progress"], p["is_falling"],
+                              facing(p["anim_start_x"], p["anim_target_x"]), P2_COLOR)
+        dst.blit(img, img.get_rect(center=(to_view(p["x"]), to_view(p["y"]))))
+    else:
+        pygame.draw.circle(dst, P2_COLOR, (to_view(p["x"]), to_view(p["y"])), max(1, to_view(player_radius)))
+
+def draw_player_labels(dst):
+    # small P1/P2 tags so two people can tell their avatars apart (HUD: native resolution)
+    for label, x, y, col in (("P1", player_x, player_y, player_color), ("P2", player2["x"], player2["y"], P2_COLOR)):
+        tag = font.render(label, True, col)
+        dst.blit(tag, tag.get_rect(midbottom=(int(x), int(y) - SPRITE_TARGET_H // 2 - 2)))
 
 # load start platform image now that START_PLATFORM_W/H are defined
 try:
@@ -443,35 +734,287 @@ try:
 except Exception:
     start_platform_image = None
 
+# Low-res world surface for the pixel-art mode. All scene art is pre-shrunk once
+# here so per-frame drawing touches RENDER_SCALE^2 fewer pixels.
+VIEW_W, VIEW_H = SCREEN_W // RENDER_SCALE, SCREEN_H // RENDER_SCALE
+_collision_sprites = {}  # shrunk player sprite -> full-size sprite its hitbox comes from
+if RENDER_SCALE > 1:
+    def _shrink(img):
+        if img is None:
+            return None
+        w, h = img.get_size()
+        return pygame.transform.smoothscale(img, (max(1, w // RENDER_SCALE), max(1, h // RENDER_SCALE)))
+
+    world = pygame.Surface((VIEW_W, VIEW_H)).convert()
+    background_surface = _shrink(background_surface)
+    stair_image = _shrink(stair_image)
+    start_platform_image = _shrink(start_platform_image)
+    _full_sprites = (sprite_idle, sprite_land, sprite_jump, sprite_air)
+    sprite_idle, sprite_land, sprite_jump, sprite_air = (
+        _shrink(sprite_idle), _shrink(sprite_land), _shrink(sprite_jump), _shrink(sprite_air))
+    # collisions stay in game space: test the full-size silhouettes, not the view copies
+    _collision_sprites = {view: full for view, full in
+                          zip((sprite_idle, sprite_land, sprite_jump, sprite_air), _full_sprites)
+                          if view is not None}
+else:
+    world = screen
+
+
+def upscale_world():
+    """Nearest-neighbour integer upscale of the world surface onto the window."""
+    if world is not screen:
+        pygame.transform.scale(world, (SCREEN_W, SCREEN_H), screen)
+
+
+# Hazards and power-ups (see entities.py), enabled with --hazards=N / --pickups=N
+# Hazards knock the player off (unless a shield is active), coins add score and
+# shields absorb one hazard hit. Collected pickups respawn elsewhere.
+entity_store = None
+entity_view_sprites = None
+score = 0
+shield_active = False
+_player_masks = {}  # full-size sprite surface (or None for the circle) -> pygame.mask.Mask
+
+
+def _make_entity_sprites():
+    hazard = pygame.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.polygon(hazard, (255, 40, 120), [(10, 0), (20, 10), (10, 20), (0, 10)])
+    pygame.draw.polygon(hazard, (255, 200, 230), [(10, 5), (15, 10), (10, 15), (5, 10)])
+    coin = pygame.Surface((14, 14), pygame.SRCALPHA)
+    pygame.draw.circle(coin, (255, 215, 0), (7, 7), 7)
+    pygame.draw.circle(coin, (255, 250, 180), (6, 6), 3)
+    shield = pygame.Surface((18, 18), pygame.SRCALPHA)
+    pygame.draw.circle(shield, (0, 240, 255), (9, 9), 9, 3)
+    pygame.draw.circle(shield, (180, 255, 255), (9, 9), 3)
+    return hazard, coin, shield
+
+
+if HAZARD_COUNT > 0 or PICKUP_COUNT > 0:
+    try:
+        import entities
+        entity_store = entities.EntityStore(max(64, HAZARD_COUNT + PICKUP_COUNT))
+        for _kind, _spr in zip((entities.KIND_HAZARD, entities.KIND_PICKUP, entities.KIND_SHIELD),
+                               _make_entity_sprites()):
+            entity_store.register_kind(_kind, _spr)
+        if RENDER_SCALE > 1:
+            entity_view_sprites = {k: _shrink(v) for k, v in entity_store.sprites.items()}
+    except Exception as e:
+        print("Hazards/power-ups unavailable (numpy required):", e)
+        entity_store = None
+
+
+def _spawn_pickup():
+    stair = random.choice(STAIRS)
+    track = random.randrange(NUM_PLAYERS)
+    kind = entities.KIND_SHIELD if random.random() < 0.25 else entities.KIND_PICKUP
+    x = stair["x"] + STAIR_WIDTH / 2 + random.uniform(-60, 60)
+    y = stair["y_base"] - random.uniform(30, 70) + track * P2_TRACK_OFFSET_Y
+    entity_store.spawn(kind, x, y, 0.0, random.uniform(-12.0, 12.0))
+
+
+def spawn_level_entities():
+    """(Re)populate hazards and pickups for a new round."""
+    if entity_store is None:
+        return
+    entity_store.clear()
+    y_max = SCREEN_H - 40 if NUM_PLAYERS > 1 else STAIRS[-1]["y_base"] + 60
+    for _ in range(HAZARD_COUNT):
+        x = random.uniform(START_PLATFORM_W + 40, SCREEN_W - 20)
+        y = random.uniform(START_PLATFORM_Y + 40, y_max)
+        vx = random.choice((-1, 1)) * random.uniform(40.0, 110.0)
+        vy = random.uniform(-30.0, 30.0)
+        entity_store.spawn(entities.KIND_HAZARD, x, y, vx, vy)
+    for _ in range(PICKUP_COUNT):
+        _spawn_pickup()
+
+
+def _mask_for(img):
+    img = _collision_sprites.get(img, img)
+    m = _player_masks.get(img)
+    if m is None:
+        if img is None:
+            circ = pygame.Surface((player_radius * 2, player_radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(circ, (255, 255, 255), (player_radius, player_radius), player_radius)
+            m = pygame.mask.from_surface(circ)
+        else:
+            m = pygame.mask.from_surface(img)
+        _player_masks[img] = m
+    return m
+
+
+def entity_hits(x, y, img):
+    """Entity indices touching a player drawn with `img` centered at (x, y)."""
+    m = _mask_for(img)
+    w, h = m.get_size()
+    return entity_store.collide(m, x - w / 2, y - h / 2)
 
-# MediaPipe camera state
-mp_hands = None
-mp_drawing = None
+
+def update_entities(dt):
+    """Move hazards/pickups and resolve their contacts with the player(s)."""
+    global score, shield_active, is_animating_jump, is_falling, fall_velocity, pending_target_index
+    if entity_store is None:
+        return
+    entity_store.step(dt, 0, 0, SCREEN_W, SCREEN_H)
+    players = [(1, player_x, player_y, get_player_sprite(), is_falling)]
+    if NUM_PLAYERS > 1:
+        p = player2
+        players.append((2, p["x"], p["y"], pick_sprite(p["is_animating_jump"], p["render_jump_progress"], p["is_falling"]), p["is_falling"]))
+    for who, x, y, img, falling in players:
+        if falling:
+            continue
+        for i in entity_hits(x, y, img):
+            if not entity_store.alive[i]:
+                continue  # already consumed by the other player this frame
+            kind = int(entity_store.kind[i])
+            entity_store.despawn(i)
+            if kind == entities.KIND_HAZARD:
+                shielded = shield_active if who == 1 else player2["shield"]
+                if shielded:
+                    if who == 1:
+                        shield_active = False
+                    else:
+                        player2["shield"] = False
+                    log_event("shield_used", player=who)
+                    continue
+                log_event("hazard_hit", player=who)
+                if who == 1:
+                    is_animating_jump = False
+                    pending_target_index = None
+                    is_falling = True
+                    fall_velocity = 0.0
+                else:
+                    player2["is_animating_jump"] = False
+                    player2["pending_target_index"] = None
+                    player2["is_falling"] = True
+                    player2["fall_velocity"] = 0.0
+                break  # knocked off: ignore the rest of this frame's contacts
+            else:
+                if kind == entities.KIND_SHIELD:
+                    if who == 1:
+                        shield_active = True
+                    else:
+                        player2["shield"] = True
+                else:
+                    if who == 1:
+                        score += 1
+                    else:
+                        player2["score"] += 1
+                log_event("pickup", player=who, item="shield" if kind == entities.KIND_SHIELD else "coin")
+                _spawn_pickup()
+
+
+def draw_entities(dst):
+    if entity_store is not None:
+        entity_store.draw(dst, RENDER_SCALE, entity_view_sprites)
+
+
+# Camera / gesture backend state
+gesture_backend = None
 cap = None
 hand_lock = threading.Lock()
 debug_window_name = "Hand Debug"
 show_debug_window = False
-
-if USE_MEDIAPIPE:
+# Adaptive inference: skip hands.process on still frames and predict in between
+inference_scheduler = None
+hand_predictors = []
+# Temporal swipe / wave recognition on the camera's hand keypoints
+gesture_recognizers = []
+
+if GESTURE_BACKEND == "auto":
+    GESTURE_BACKEND = "mediapipe" if HAVE_MEDIAPIPE else ("motion" if HAVE_CV2 else "simulated")
+if GESTURE_BACKEND != "simulated":
     try:
-        mp = mp
-        mp_hands = mp.solutions.hands
-        mp_drawing = mp.solutions.drawing_utils
-        # Try to open default camera
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
+        if not HAVE_CV2:
+            raise RuntimeError("opencv-python is not installed")
+        from hand_tracking import GESTURE_BACKENDS, AdaptiveInferenceScheduler, GestureRecognizer, HandPredictor
+        from frame_sources import open_frame_source
+        if GESTURE_BACKEND not in GESTURE_BACKENDS:
+            raise RuntimeError(f"unknown backend {GESTURE_BACKEND!r} (choose from {', '.join(GESTURE_BACKENDS)}, simulated)")
+        # the motion backend works on a tiny frame; don't pay for decoding a big one
+        cap = open_frame_source(CAMERA_SOURCE, size=(320, 240) if GESTURE_BACKEND == "motion" else None)
+        gesture_backend = GESTURE_BACKENDS[GESTURE_BACKEND](max_hands=NUM_PLAYERS)
+        USE_CAMERA = True
+        show_debug_window = True
+        hand_predictors = [HandPredictor() for _ in range(NUM_PLAYERS)]
+        gesture_recognizers = [GestureRecognizer() for _ in range(NUM_PLAYERS)]
+        if ADAPTIVE_INFERENCE and gesture_backend.expensive:
+            inference_scheduler = AdaptiveInferenceScheduler(every_active=INFER_EVERY)
+        print(f"Gesture backend: {GESTURE_BACKEND} ({cap.name} source)")
+    except Exception as e:
+        print(f"Gesture backend '{GESTURE_BACKEND}' unavailable ({e}); using simulated hand")
+        if cap is not None:
             cap.release()
             cap = None
-            USE_MEDIAPIPE = False
-        else:
-            # create a persistent Hands object for efficiency
-            hands = mp_hands.Hands(static_image_mode=False,
-                                   max_num_hands=1,
-                                   min_detection_confidence=0.5,
-                                   min_tracking_confidence=0.5)
-            show_debug_window = True
-    except Exception:
-        USE_MEDIAPIPE = False
+        USE_CAMERA = False
+
+# Optional shared-memory frame export for external compositors
+frame_exporter = None
+soak_monitor = None  # set up just before the main loop in --soak mode
+# Offline replay output: frames drawn during --replay are encoded here
+replay_writer = None
+if replayer is not None and REPLAY_OUT:
+    replay_writer = _replay_mod.open_frame_writer(REPLAY_OUT, REPLAY_FPS)
+if EXPORT_SHM_NAME:
+    try:
+        from frame_export import ShmFrameWriter
+        frame_exporter = ShmFrameWriter(EXPORT_SHM_NAME, SCREEN_W, SCREEN_H, EXPORT_SHM_SLOTS)
+        print(f"Exporting frames to shared memory '{EXPORT_SHM_NAME}'")
+    except Exception as e:
+        print("Shared-memory export unavailable:", e)
+        frame_exporter = None
+
+
+def present_frame(idle_key=None):
+    """Show the finished `screen` (and publish it to shared memory if enabled).
+
+    Static screens pass an `idle_key`; while it stays on display the loop calls
+    wait_for_input() instead of redrawing the same picture.
+    """
+    global frame_exporter, idle_presented
+    if frame_exporter is not None:
+        try:
+            frame_exporter.publish(screen)
+        except Exception:
+            frame_exporter.close()
+            frame_exporter = None
+    if replay_writer is not None:
+        replay_writer.append_data(pygame.surfarray.array3d(screen).swapaxes(0, 1))
+    pygame.display.flip()
+    idle_presented = idle_key if IDLE_POWER else None
+    if soak_monitor is not None or game_metrics is not None:
+        # work time of this frame (loop top to flip, without the clock.tick sleep);
+        # real time, not sim_time(), which is a fixed-step trace clock under --replay
+        work = time.perf_counter() - work_start
+        if soak_monitor is not None:
+            soak_monitor.frame(work)
+        if game_metrics is not None:
+            game_metrics.frame_time.observe(work)
+
+
+idle_presented = None  # idle_key of the static screen currently shown
+
+
+def is_idle(idle_key):
+    return IDLE_POWER and idle_key is not None and idle_presented == idle_key
+
+
+def wait_for_input():
+    """Block until an event arrives (or IDLE_WAIT_MS passes) without redrawing.
+
+    The event is put back on the queue for the normal handler, and the static
+    screen is marked for one redraw since the input may have changed it.
+    """
+    global idle_presented, prev_frame_time
+    ev = pygame.event.wait(IDLE_WAIT_MS)
+    if ev.type != pygame.NOEVENT:
+        try:
+            pygame.event.post(ev)
+        except Exception:
+            pass
+        idle_presented = None
+    # don't let the blocked time show up as one huge frame delta
+    prev_frame_time = sim_time()
+
 
 running = True
 last_jump_distance = 0.0
@@ -483,12 +1026,16 @@ pending_target_index = None
 is_falling = False
 fall_velocity = 0.0
 GRAVITY = 1200.0
-prev_frame_time = time.time()
+prev_frame_time = sim_time()
 
 # Victory celebration (confetti)
 confetti_particles = []
 confetti_active = False
-victory_prev_time = time.time()
+victory_prev_time = sim_time()
+victory_start_time = victory_prev_time
+# new rockets launch for this long; afterwards the sparks burn out and the
+# victory screen turns static (idle power mode)
+VICTORY_CELEBRATION_SECONDS = 12.0
 VICTORY_GRAVITY = 400.0
 CONFETTI_COLORS = [
     (255, 99, 71),    # tomato
@@ -546,12 +1093,13 @@ def explode_rocket(rx, count=80, speed_min=120, speed_max=420):
         confetti_particles.append([float(x), float(y), vx, vy, life, col, size])
 
 def start_victory_celebration():
-    global confetti_active, confetti_particles, victory_prev_time
+    global confetti_active, confetti_particles, victory_prev_time, victory_start_time
     if confetti_active:
         return
     confetti_active = True
     confetti_particles.clear()
-    victory_prev_time = time.time()
+    victory_prev_time = sim_time()
+    victory_start_time = victory_prev_time
     # Launch several fireworks rockets that will explode in the upper half
     for _ in range(6):
         # spread launches across the width, slight horizontal variance
@@ -565,14 +1113,553 @@ def start_victory_celebration():
     except Exception:
         pass
 
-start_time = time.time()
+
+# Two-player mode (--players=2)
+# Player 1 keeps using the module-level globals above; player 2 lives in a dict
+# and plays on a copy of the stair track shifted down by P2_TRACK_OFFSET_Y.
+# Both players are fed from the same MediaPipe pass (max_num_hands=NUM_PLAYERS).
+P2_TRACK_OFFSET_Y = 190
+P2_COLOR = (60, 160, 255)
+winner = 0  # 0 = nobody yet / single player, otherwise 1 or 2
+
+player2 = {
+    "x": float(START_PLATFORM_X + START_PLATFORM_W / 2),
+    "y": float(START_PLATFORM_Y + P2_TRACK_OFFSET_Y - player_radius),
+    "stair_index": -1,
+    "is_animating_jump": False,
+    "anim_start_x": 0.0, "anim_start_y": 0.0,
+    "anim_target_x": 0.0, "anim_target_y": 0.0,
+    "anim_start_time": 0.0,
+    "render_jump_progress": None,
+    "pending_target_index": None,
+    "is_falling": False,
+    "fall_velocity": 0.0,
+    "hand_y": 500.0, "hand_width": 0.0, "hand_center_x": SCREEN_W // 2,
+    "prev_hand_center_x": None,
+    "vertical_ready": True,
+    "last_gesture_time": 0.0,
+    "last_autoplay_time": 0.0,
+    "score": 0,
+    "shield": False,
+}
+
+# Pre-transformed player frames (see sprite_anim.py). The poses of a jump are
+# baked here so the first jumps don't hitch; anything else is baked on first use.
+sprite_cache = None
+if SPRITE_FX and any(s is not None for s in (sprite_idle, sprite_land, sprite_jump, sprite_air)):
+    import sprite_anim
+    sprite_cache = sprite_anim.SpriteFrameCache(glow_radius=max(1, sprite_anim.GLOW_RADIUS // RENDER_SCALE))
+    _bake_colors = [player_color, P2_COLOR] if NUM_PLAYERS > 1 else [player_color]
+    _t_bake = time.time()
+    _baked = sprite_cache.prebake(sprite_anim.jump_poses(pick_sprite, _bake_colors))
+    print(f"Sprite cache: {_baked} frames baked in {(time.time() - _t_bake) * 1000:.0f} ms")
+
+# Hand -> player assignment. Each track remembers where its hand was last seen
+# and which hand (Left/Right) it was, so hands keep their player across frames
+# even when MediaPipe reorders multi_hand_landmarks.
+HAND_TRACK_TIMEOUT = 1.0      # seconds without a detection before a track is freed
+HANDEDNESS_SWITCH_COST = 0.35  # extra cost (normalized screen units) for a label change
+HAND_MATCH_REWARD = 2.0        # > any distance + switch cost, so every hand gets a player
+hand_tracks = [{"cx": None, "cy": None, "label": None, "seen": 0.0} for _ in range(2)]
+
+
+def p2_stair_top(index):
+    stair = STAIRS[index]
+    return stair.get("y", stair["y_base"]) + P2_TRACK_OFFSET_Y
+
+
+def respawn_player2():
+    """Put player 2 back on its start platform; score and shield carry over (like P1 falls)."""
+    p = player2
+    p["x"] = float(START_PLATFORM_X + START_PLATFORM_W / 2)
+    p["y"] = float(START_PLATFORM_Y + P2_TRACK_OFFSET_Y - player_radius)
+    p["stair_index"] = -1
+    p["is_animating_jump"] = False
+    p["render_jump_progress"] = None
+    p["pending_target_index"] = None
+    p["is_falling"] = False
+    p["fall_velocity"] = 0.0
+
+
+def reset_player2():
+    """Start player 2 over for a new round."""
+    respawn_player2()
+    player2["score"] = 0
+    player2["shield"] = False
+
+
+def assign_hands(detections, now):
+    """Map detections [(label, cx, cy), ...] (normalized coords) to player slots.
+
+    Returns a list with one detection index (or None) per player. Known tracks
+    are matched by position continuity plus a penalty for a handedness switch;
+    fresh tracks are filled left-to-right by screen x.
+    """
+    import itertools
+    n_players = NUM_PLAYERS
+    for tr in hand_tracks:
+        if tr["cx"] is not None and now - tr["seen"] > HAND_TRACK_TIMEOUT:
+            tr["cx"] = tr["cy"] = tr["label"] = None
+    slots = list(range(len(detections))) + [None] * n_players
+    best, best_cost = [None] * n_players, None
+    for perm in itertools.permutations(slots, n_players):
+        cost = 0.0
+        for player, di in enumerate(perm):
+            tr = hand_tracks[player]
+            if di is None:
+                continue
+            label, cx, cy = detections[di]
+            cost -= HAND_MATCH_REWARD
+            if tr["cx"] is None:
+                # untracked: prefer P1 on the left half, P2 on the right half
+                cost += abs(cx - (0.25 + 0.5 * player))
+            else:
+                cost += math.hypot(cx - tr["cx"], cy - tr["cy"])
+                if tr["label"] is not None and label != tr["label"]:
+                    cost += HANDEDNESS_SWITCH_COST
+        if best_cost is None or cost < best_cost:
+            best, best_cost = list(perm), cost
+    for player, di in enumerate(best):
+        if di is not None:
+            label, cx, cy = detections[di]
+            hand_tracks[player].update(cx=cx, cy=cy, label=label, seen=now)
+    return best
+
+
+def set_player_hand(player, y, width, center_x):
+    """Write one player's hand signals (player 0 = the hand_* globals)."""
+    global hand_y, hand_width, hand_center_x
+    if player == 0:
+        with hand_lock:
+            hand_y = y
+            hand_width = width
+            hand_center_x = center_x
+    else:
+        player2["hand_y"] = y
+        player2["hand_width"] = width
+        player2["hand_center_x"] = center_x
+
+
+def schedule_p2_jump(index, now):
+    p = player2
+    if index < 0 or index >= len(STAIRS):
+        return False
+    p["is_animating_jump"] = True
+    p["anim_start_x"], p["anim_start_y"] = p["x"], p["y"]
+    p["anim_target_x"] = float(STAIRS[index]["x"] + STAIR_WIDTH / 2)
+    p["anim_target_y"] = float(p2_stair_top(index) - player_radius)
+    p["anim_start_time"] = now
+    p["pending_target_index"] = index
+    p["last_gesture_time"] = now
+    log_event("jump", player=2, target=index)
+    try:
+        if jump_sound is not None:
+            jump_sound.play()
+    except Exception:
+        pass
+    return True
+
+
+def recognize_gesture(player, now, center_x, prev_center_x):
+    """(kind, dx in pixels) recognized this frame, or None.
+
+    With a camera the temporal recognizer decides from the palm velocity over a
+    time window; the simulated hand keeps the one-frame difference tuned with
+    [ and ].
+    """
+    if USE_CAMERA and gesture_recognizers:
+        gesture = gesture_recognizers[player].poll(now)
+        return None if gesture is None else (gesture.kind, gesture.dx * SCREEN_W)
+    if prev_center_x is None:
+        return None
+    dx = center_x - prev_center_x
+    return ("swipe_right", dx) if dx > SWIPE_THRESHOLD else None
+
+
+def detect_swipe(player, now, center_x, prev_center_x):
+    """Rightward swipe distance (pixels) seen this frame, or None.
+
+    Live gestures are written to the input trace; a replay takes them from the
+    trace instead of re-detecting, so camera runs replay the same jumps.
+    """
+    if replayer is not None and replayer.recorded_gestures:
+        gesture = replayer.gesture(player)
+    else:
+        gesture = recognize_gesture(player, now, center_x, prev_center_x)
+        if gesture is not None and trace_recorder is not None:
+            trace_recorder.gesture(now_frame, player, *gesture)
+    if gesture is None:
+        return None
+    kind, dx = gesture
+    if kind == "wave":
+        # recognized and logged, but no game action is bound to it yet
+        log_event("gesture", player=player + 1, type="wave")
+    return dx if kind == "swipe_right" else None
+
+
+def update_player2(now, dt):
+    """One tick of player 2: gestures, autoplay, jump animation, landing and falls.
+
+    Mirrors the player 1 logic in the main loop. A fall respawns player 2 on its
+    start platform; reaching the last stair first wins the round.
+    """
+    global game_won, winner
+    p = player2
+    grounded = (not p["is_animating_jump"]) and (not p["is_falling"])
+    if grounded:
+        if 0 <= p["stair_index"] < len(STAIRS):
+            p["y"] = float(p2_stair_top(p["stair_index"]) - player_radius)
+        else:
+            p["y"] = float(START_PLATFORM_Y + P2_TRACK_OFFSET_Y - player_radius)
+    next_index = p["stair_index"] + 1
+    cooled = (now - p["last_gesture_time"]) > SWIPE_COOLDOWN
+
+    if AUTO_PLAY and grounded and next_index < len(STAIRS) and (now - p["last_autoplay_time"]) > AUTOPLAY_INTERVAL:
+        if schedule_p2_jump(next_index, now):
+            p["last_autoplay_time"] = now
+            grounded = False
+
+    # rightward swipe
+    swipe_dx = detect_swipe(1, now, p["hand_center_x"], p["prev_hand_center_x"])
+    if swipe_dx is not None and grounded and cooled and next_index < len(STAIRS):
+        if schedule_p2_jump(next_index, now):
+            log_event("gesture", player=2, type="swipe")
+            p["hand_center_x"] = SCREEN_W + 100
+            grounded = False
+    p["prev_hand_center_x"] = p["hand_center_x"]
+
+    # vertical trigger with hysteresis
+    if grounded and p["vertical_ready"] and p["hand_y"] < jump_threshold:
+        if next_index < len(STAIRS) and p["hand_width"] > 10 and cooled:
+            if schedule_p2_jump(next_index, now):
+                log_event("gesture", player=2, type="vertical")
+                p["hand_y"] = SCREEN_H + 100
+                p["vertical_ready"] = False
+    if not p["vertical_ready"] and p["hand_y"] > (jump_threshold + VERTICAL_HYSTERESIS):
+        p["vertical_ready"] = True
+
+    if p["is_animating_jump"]:
+        prog = (now - p["anim_start_time"]) / JUMP_DURATION
+        p["render_jump_progress"] = max(0.0, min(1.0, prog))
+        if prog >= 1.0:
+            p["x"], p["y"] = p["anim_target_x"], p["anim_target_y"]
+            p["is_animating_jump"] = False
+            idx = p["pending_target_index"]
+            p["pending_target_index"] = None
+            if idx is not None and 0 <= idx < len(STAIRS) and abs(p["x"] - (STAIRS[idx]["x"] + STAIR_WIDTH / 2)) < 2.0:
+                p["stair_index"] = idx
+                p["y"] = float(p2_stair_top(idx) - player_radius)
+                log_event("land", player=2, stair=idx)
+                if idx == len(STAIRS) - 1 and not game_won:
+                    game_won = True
+                    winner = 2
+                    log_event("game_won", player=2)
+                    start_victory_celebration()
+            else:
+                p["is_falling"] = True
+                p["fall_velocity"] = 0.0
+                log_event("fall", player=2, target=idx)
+        else:
+            e = 1 - pow(1 - prog, 3)
+            p["x"] = p["anim_start_x"] + (p["anim_target_x"] - p["anim_start_x"]) * e
+            p["y"] = p["anim_start_y"] + (p["anim_target_y"] - p["anim_start_y"]) * e
+
+    if p["is_falling"]:
+        p["fall_velocity"] += GRAVITY * dt
+        p["y"] += p["fall_velocity"] * dt
+        if p["y"] > SCREEN_H + 20:
+            respawn_player2()
+
+
+# State snapshots (rewind / quick save / replay debugging)
+# Every gameplay tick the whole simulation state is packed into a fixed-size
+# ring of flat arrays, so memory stays bounded however long the session runs.
+# Absolute timestamps are stored relative to "now" so a restored snapshot
+# resumes smoothly instead of jumping ahead.
+SNAPSHOT_FIELDS = (
+    "sim_t",                 # seconds since start_time (drives stair phase)
+    "player_x", "player_y",
+    "is_animating_jump",
+    "anim_start_x", "anim_start_y", "anim_target_x", "anim_target_y",
+    "anim_elapsed",          # now - anim_start_time
+    "render_jump_progress",  # NaN means None
+    "pending_target_index",  # NaN means None
+    "current_stair_index",
+    "is_falling", "fall_velocity",
+    "game_over", "game_won",
+    "hand_y", "hand_width", "hand_center_x",
+    "prev_hand_center_x",    # NaN means None
+    "vertical_ready",
+    "gesture_age",           # now - last_gesture_time
+    "autoplay_age",          # now - _last_autoplay_time
+    "last_jump_distance",
+    "parallax_offset_x", "parallax_origin_x",
+    "rng_gauss_next",        # NaN means None
+    "winner",
+    "score", "shield_active",
+)
+# player 2 dict keys appended after SNAPSHOT_FIELDS (stored as "p2_<key>")
+P2_SNAPSHOT_KEYS = tuple(player2.keys())
+P2_TIME_KEYS = ("anim_start_time", "last_gesture_time", "last_autoplay_time")  # stored as ages
+P2_INT_KEYS = ("stair_index", "pending_target_index", "score")
+P2_BOOL_KEYS = ("is_animating_jump", "is_falling", "vertical_ready", "shield")
+SNAPSHOT_FIELDS = SNAPSHOT_FIELDS + tuple("p2_" + k for k in P2_SNAPSHOT_KEYS)
+SNAPSHOT_CAPACITY = 600   # ~10 seconds at 60 FPS
+REWIND_TICKS = 60         # BACKSPACE rewinds about one second
+_RNG_VERSION = random.getstate()[0]
+_RNG_STATE_LEN = len(random.getstate()[1])
+
+
+class SnapshotRing:
+    """Fixed-memory ring buffer of simulation snapshots.
+
+    Floats live in one array('d') of capacity * stride values and the
+    Mersenne Twister state in one array('I'), both allocated once up front.
+    A push copies into its slot through short-lived temporaries (the packed
+    tuple, random.getstate()'s word tuple and one array per slice), so memory
+    stays flat but a tick is not allocation-free.
+    """
+    __slots__ = ("capacity", "stride", "floats", "rng", "entities", "head", "count")
+
+    def __init__(self, capacity, stride, rng_len, entity_history=None):
+        self.capacity = capacity
+        self.stride = stride
+        self.floats = array("d", [0.0]) * (capacity * stride)
+        self.rng = array("I", [0]) * (capacity * rng_len)
+        # hazards / pickups (entities.EntityHistory with the same slot count), if enabled
+        self.entities = entity_history
+        self.head = 0    # slot the next push writes to
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def push(self, values, rng_words, entity_store=None):
+        slot = self.head
+        s = self.stride
+        self.floats[slot * s:(slot + 1) * s] = array("d", values)
+        n = len(rng_words)
+        self.rng[slot * n:(slot + 1) * n] = array("I", rng_words)
+        if self.entities is not None and entity_store is not None:
+            self.entities.save(slot, entity_store)
+        self.head = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def peek(self, back=0):
+        """Return (values, rng_words, entity components or None) of the snapshot
+        `back` ticks before the newest."""
+        if back < 0 or back >= self.count:
+            return None
+        slot = (self.head - 1 - back) % self.capacity
+        s = self.stride
+        n = len(self.rng) // self.capacity
+        ents = self.entities.load(slot) if self.entities is not None else None
+        return self.floats[slot * s:(slot + 1) * s], self.rng[slot * n:(slot + 1) * n], ents
+
+    def rewind(self, steps):
+        """Drop up to `steps` newest snapshots and return the one that is now newest."""
+        steps = max(0, min(steps, self.count - 1))
+        self.head = (self.head - steps) % self.capacity
+        self.count -= steps
+        return self.peek(0)
+
+    def dump(self, path):
+        # oldest -> newest, raw native-endian arrays with a tiny text header
+        # (player / RNG state only; entity arrays are not part of the dump)
+        with open(path, "wb") as f:
+            f.write(f"snapshots {self.count} {self.stride} {_RNG_STATE_LEN}\n".encode())
+            f.write((",".join(SNAPSHOT_FIELDS) + "\n").encode())
+            for back in range(self.count - 1, -1, -1):
+                values, rng_words, _ = self.peek(back)
+                values.tofile(f)
+                rng_words.tofile(f)
+
+
+snapshot_ring = SnapshotRing(SNAPSHOT_CAPACITY, len(SNAPSHOT_FIELDS), _RNG_STATE_LEN,
+                             entities.EntityHistory(SNAPSHOT_CAPACITY, entity_store.capacity)
+                             if entity_store is not None else None)
+quick_save = None  # (values, rng_words, entities) copied out of the ring by F5
+
+
+def _none_to_nan(v):
+    return float("nan") if v is None else float(v)
+
+
+def _nan_to_none(v):
+    return None if v != v else v
+
+
+def capture_snapshot():
+    """Pack the current simulation state into a flat tuple plus RNG words; the
+    live entity store is returned as-is and copied by SnapshotRing.push()."""
+    now = sim_time()
+    rng_version, rng_words, rng_gauss = random.getstate()
+    values = (
+        now - start_time,
+        player_x, player_y,
+        float(is_animating_jump),
+        anim_start_x, anim_start_y, anim_target_x, anim_target_y,
+        now - anim_start_time,
+        _none_to_nan(render_jump_progress),
+        _none_to_nan(pending_target_index),
+        float(current_stair_index),
+        float(is_falling), fall_velocity,
+        float(game_over), float(game_won),
+        float(hand_y), float(hand_width), float(hand_center_x),
+        _none_to_nan(prev_hand_center_x),
+        float(vertical_ready),
+        now - last_gesture_time,
+        now - _last_autoplay_time,
+        float(last_jump_distance),
+        parallax_offset_x, parallax_origin_x,
+        _none_to_nan(rng_gauss),
+        float(winner),
+        float(score), float(shield_active),
+    )
+    values += tuple((now - player2[k]) if k in P2_TIME_KEYS else _none_to_nan(player2[k])
+                    for k in P2_SNAPSHOT_KEYS)
+    return values, rng_words, entity_store
+
+
+def restore_snapshot(values, rng_words, entity_components=None):
+    """Inverse of capture_snapshot(): write a snapshot back into the globals."""
+    global start_time, player_x, player_y, is_animating_jump
+    global anim_start_x, anim_start_y, anim_target_x, anim_target_y, anim_start_time
+    global render_jump_progress, pending_target_index, current_stair_index
+    global is_falling, fall_velocity, game_over, game_won
+    global hand_y, hand_width, hand_center_x, prev_hand_center_x, vertical_ready
+    global last_gesture_time, _last_autoplay_time, last_jump_distance, parallax_offset_x, parallax_origin_x
+    global prev_frame_time, confetti_active, winner, score, shield_active
+    now = sim_time()
+    v = dict(zip(SNAPSHOT_FIELDS, values))
+    start_time = now - v["sim_t"]
+    player_x, player_y = v["player_x"], v["player_y"]
+    is_animating_jump = bool(v["is_animating_jump"])
+    anim_start_x, anim_start_y = v["anim_start_x"], v["anim_start_y"]
+    anim_target_x, anim_target_y = v["anim_target_x"], v["anim_target_y"]
+    anim_start_time = now - v["anim_elapsed"]
+    render_jump_progress = _nan_to_none(v["render_jump_progress"])
+    pti = _nan_to_none(v["pending_target_index"])
+    pending_target_index = None if pti is None else int(pti)
+    current_stair_index = int(v["current_stair_index"])
+    is_falling = bool(v["is_falling"])
+    fall_velocity = v["fall_velocity"]
+    game_over = bool(v["game_over"])
+    game_won = bool(v["game_won"])
+    if not game_won:
+        # leaving the victory screen: stop the celebration so it can restart later
+        confetti_active = False
+        confetti_particles.clear()
+        firework_rockets.clear()
+    hand_y, hand_width, hand_center_x = v["hand_y"], v["hand_width"], v["hand_center_x"]
+    prev_hand_center_x = _nan_to_none(v["prev_hand_center_x"])
+    vertical_ready = bool(v["vertical_ready"])
+    last_gesture_time = now - v["gesture_age"]
+    _last_autoplay_time = now - v["autoplay_age"]
+    last_jump_distance = v["last_jump_distance"]
+    parallax_offset_x, parallax_origin_x = v["parallax_offset_x"], v["parallax_origin_x"]
+    random.setstate((_RNG_VERSION, tuple(rng_words), _nan_to_none(v["rng_gauss_next"])))
+    winner = int(v["winner"])
+    score = int(v["score"])
+    shield_active = bool(v["shield_active"])
+    for k in P2_SNAPSHOT_KEYS:
+        val = v["p2_" + k]
+        if k in P2_TIME_KEYS:
+            val = now - val
+        elif k in P2_BOOL_KEYS:
+            val = bool(val)
+        else:
+            val = _nan_to_none(val)
+            if val is not None and k in P2_INT_KEYS:
+                val = int(val)
+        player2[k] = val
+    if entity_store is not None and entity_components is not None:
+        entity_store.restore(entity_components)
+    # avoid a huge dt on the first tick after restoring
+    prev_frame_time = now
+
+
+# Soak mode: cycle title -> autoplay round -> result -> title unattended and
+# report memory / frame-time drift periodically (see soak.py)
+SOAK_TITLE_SECONDS = 2.0
+SOAK_RESULT_SECONDS = VICTORY_CELEBRATION_SECONDS + 3.0  # let the fireworks burn out
+SOAK_ROUND_TIMEOUT = 180.0  # restart a round that never finishes
+soak_phase = None
+soak_phase_since = 0.0
+if SOAK_HOURS is not None:
+    import soak as _soak_mod
+    soak_monitor = _soak_mod.SoakMonitor(SOAK_REPORT_PATH, SOAK_INTERVAL)
+    print(f"Soak mode: {SOAK_HOURS or 'unlimited'} h, report every {SOAK_INTERVAL:.0f} s"
+          + (f" -> {SOAK_REPORT_PATH}" if SOAK_REPORT_PATH else ""))
+
+
+def limit_fps(fps):
+    # replays render as fast as the CPU allows
+    if replayer is None:
+        clock.tick(fps)
+
+
+def soak_tick(now):
+    """Advance the soak cycle by posting the keys a visitor would press."""
+    global soak_phase, soak_phase_since, game_started, running
+    if not game_started:
+        phase = "title"
+    elif game_won or game_over:
+        phase = "result"
+    else:
+        phase = "round"
+    if phase != soak_phase:
+        if phase == "result":
+            soak_monitor.cycles += 1
+        soak_phase, soak_phase_since = phase, now
+    held = now - soak_phase_since
+    if phase == "title" and held >= SOAK_TITLE_SECONDS:
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        soak_phase_since = now
+    elif (phase == "result" and held >= SOAK_RESULT_SECONDS) or \
+            (phase == "round" and held >= SOAK_ROUND_TIMEOUT):
+        # R resets the round; dropping game_started sends it back to the title
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_r))
+        game_started = False
+    if soak_monitor.poll(now):
+        soak_monitor.report(particles=len(confetti_particles),
+                            rockets=len(firework_rockets),
+                            entities=entity_store.count() if entity_store is not None else 0,
+                            sprite_frames=len(sprite_cache) if sprite_cache is not None else 0,
+                            snapshots=len(snapshot_ring))
+    if SOAK_HOURS and now - soak_monitor.started >= SOAK_HOURS * 3600.0:
+        running = False
+
+
+start_time = sim_time()
 
 while running:
+    work_start = time.perf_counter()
+    replay_keys = ()
+    if replayer is not None:
+        step = replayer.advance()
+        if step is None:
+            break
+        _sim_now, replay_keys = step
+    # frames before the requested replay range are simulated but not drawn
+    replay_skip_draw = replayer is not None and not replayer.rendering
     # compute frame delta time for physics and timing
-    now_frame = time.time()
+    now_frame = sim_time()
     dt = now_frame - prev_frame_time
     prev_frame_time = now_frame
-    for event in pygame.event.get():
+    if telemetry is not None:
+        telemetry.frame(dt)
+    events = pygame.event.get()
+    if replayer is not None:
+        events += [pygame.event.Event(pygame.KEYDOWN, key=k) for k in replay_keys]
+    elif trace_recorder is not None:
+        trace_recorder.keys(now_frame, [e.key for e in events
+                                        if e.type == pygame.KEYDOWN and e.key != pygame.K_ESCAPE])
+    for event in events:
         if event.type == pygame.QUIT:
             running = False
         elif event.type == pygame.KEYDOWN:
@@ -583,8 +1670,15 @@ while running:
                     # Start the game from the title/pause screen
                     game_started = True
                     # reset timers and player so the game begins cleanly
-                    start_time = time.time()
+                    start_time = sim_time()
                     reset_player_to_start()
+                    reset_player2()
+                    score = 0
+                    shield_active = False
+                    spawn_level_entities()
+                    winner = 0
+                    snapshot_ring.clear()
+                    log_event("game_start", players=NUM_PLAYERS)
                 else:
                     # manual jump trigger for testing during gameplay
                     jump_distance = max(0.0, hand_width * 2.0)
@@ -592,9 +1686,31 @@ while running:
                     last_jump_distance = jump_distance
             elif event.key == pygame.K_r:
                 reset_player_to_start()
+                reset_player2()
+                score = 0
+                shield_active = False
+                spawn_level_entities()
+                winner = 0
+                # leave the victory screen too (reset_player_to_start only clears game_over)
+                game_won = False
+                confetti_active = False
+                confetti_particles.clear()
+                firework_rockets.clear()
+            elif event.key == pygame.K_BACKSPACE and game_started:
+                # instant rewind: step back through the snapshot ring
+                snap = snapshot_ring.rewind(REWIND_TICKS)
+                if snap is not None:
+                    restore_snapshot(*snap)
+            elif event.key == pygame.K_F5 and game_started:
+                snap = snapshot_ring.peek(0)
+                if snap is not None:
+                    quick_save = snap  # peek() returns copies, safe to keep
+            elif event.key == pygame.K_F9 and game_started and quick_save is not None:
+                restore_snapshot(*quick_save)
             elif event.key == pygame.K_q:
                 # allow Q to quickly force game over for testing
                 game_over = True
+                log_event("game_over", forced=True)
             elif event.key == pygame.K_i:
                 invert_hand_y = not invert_hand_y
             elif event.key == pygame.K_d:
@@ -613,58 +1729,80 @@ while running:
             elif event.key == pygame.K_QUOTE:  # '
                 VERTICAL_HYSTERESIS = min(200, VERTICAL_HYSTERESIS + 5)
 
+    if soak_monitor is not None:
+        soak_tick(now_frame)
+
     # If the game hasn't started yet, show the title/pause screen and skip updates
     if not game_started:
-        # Draw title/pause background
-        if background_surface is not None:
-            screen.blit(background_surface, (0, 0))
-        else:
-            screen.fill((10, 10, 30))
-
-        # Title image (use provided image if available), otherwise fallback to text
-        if title_image is not None:
-            trect = title_image.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 - 40))
-            screen.blit(title_image, trect)
-        else:
-            # Title text
-            title_surf = title_font.render("Ladder Demo", True, (255, 240, 200))
-            title_rect = title_surf.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 - 40))
-            screen.blit(title_surf, title_rect)
-
-        instr_surf = font.render("按 SPACE 开始游戏  |  ESC 退出", True, (200, 200, 180))
-        instr_rect = instr_surf.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 + 20))
-        screen.blit(instr_surf, instr_rect)
-
-        hint_surf = font.render("在游戏中按 SPACE 触发跳跃，R 重置，I 反转手势映射", True, (180, 180, 160))
-        hint_rect = hint_surf.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 + 60))
-        screen.blit(hint_surf, hint_rect)
-
-        # draw start platform and player so avatar is visible at start
-        draw_start_platform(screen)
-        draw_player(screen)
-        # If recording, we skip title screen and start immediately
-        if RECORD_GIF:
+        if AUTO_START:
+            # Recording (or replaying such a recording): skip the title screen and
+            # start immediately. This is game state, so it also runs on replay
+            # frames whose drawing is skipped.
             game_started = True
-            start_time = time.time()
+            start_time = sim_time()
             reset_player_to_start()
+            reset_player2()
+            score = 0
+            shield_active = False
+            spawn_level_entities()
+            # fall through into gameplay
         else:
-            pygame.display.flip()
-            clock.tick(60)
+            title_key = ("title",)
+            if is_idle(title_key):
+                wait_for_input()
+                continue
+            if replay_skip_draw:
+                continue
+            # Draw title/pause background
+            if background_surface is not None:
+                world.blit(background_surface, (0, 0))
+            else:
+                world.fill((10, 10, 30))
+
+            # draw start platform and player so avatar is visible at start
+            draw_start_platform(world)
+            draw_player(world)
+            if NUM_PLAYERS > 1:
+                draw_start_platform(world, P2_TRACK_OFFSET_Y)
+                draw_player2(world)
+            upscale_world()
+            if NUM_PLAYERS > 1:
+                draw_player_labels(screen)
+
+            # Title image (use provided image if available), otherwise fallback to text
+            if title_image is not None:
+                trect = title_image.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 - 40))
+                screen.blit(title_image, trect)
+            else:
+                # Title text
+                title_surf = title_font.render("Ladder Demo", True, (255, 240, 200))
+                title_rect = title_surf.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 - 40))
+                screen.blit(title_surf, title_rect)
+
+            instr_surf = font.render("按 SPACE 开始游戏  |  ESC 退出", True, (200, 200, 180))
+            instr_rect = instr_surf.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 + 20))
+            screen.blit(instr_surf, instr_rect)
+
+            hint_surf = font.render("在游戏中按 SPACE 触发跳跃，R 重置，I 反转手势映射", True, (180, 180, 160))
+            hint_rect = hint_surf.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 + 60))
+            screen.blit(hint_surf, hint_rect)
+
+            present_frame(title_key)
+            limit_fps(60)
             # Skip game updates until started
             continue
-        # fall through into gameplay when recording
 
     # If game over, show game over screen and wait for reset
     # If game won, show victory screen
     if game_won:
-        # background
-        if background_surface is not None:
-            screen.blit(background_surface, (0, 0))
-        else:
-            screen.fill((5, 10, 20))
+        victory_key = ("victory", winner)
+        if is_idle(victory_key):
+            wait_for_input()
+            victory_prev_time = sim_time()
+            continue
 
         # update confetti physics
-        nowv = time.time()
+        nowv = sim_time()
         dtv = nowv - victory_prev_time
         victory_prev_time = nowv
         # Update rockets
@@ -704,8 +1842,17 @@ while running:
         confetti_particles[:] = alive
 
         # If fewer sparks, occasionally launch new rockets to sustain festival feel
-        if len(confetti_particles) < 160 and len(firework_rockets) < 4:
+        celebrating = (nowv - victory_start_time) < VICTORY_CELEBRATION_SECONDS or not IDLE_POWER
+        if celebrating and len(confetti_particles) < 160 and len(firework_rockets) < 4:
             spawn_firework_rocket()
+        if replay_skip_draw:
+            continue
+
+        # background
+        if background_surface is not None:
+            world.blit(background_surface, (0, 0))
+        else:
+            world.fill((5, 10, 20))
 
         # draw sparks (bright points)
         for x, y, vx, vy, life, col, size in confetti_particles:
@@ -713,41 +1860,52 @@ while running:
             alpha = max(0.2, min(1.0, life / 2.6))
             # simple brightness modulation instead of true alpha blending
             col_draw = (int(col[0] * alpha), int(col[1] * alpha), int(col[2] * alpha))
-            pygame.draw.rect(screen, col_draw, (int(x), int(y), size, size))
+            pygame.draw.rect(world, col_draw, (to_view(x), to_view(y), max(1, size // RENDER_SCALE), max(1, size // RENDER_SCALE)))
 
         # draw rockets as small bright points while rising
         for x, y, vx, vy, target_y, exploded, col in firework_rockets:
-            pygame.draw.circle(screen, col, (int(x), int(y)), 3)
+            pygame.draw.circle(world, col, (to_view(x), to_view(y)), max(1, 3 // RENDER_SCALE))
+        upscale_world()
 
         # title
-        win = title_font.render("Congratulations!", True, (235, 245, 255))
+        win_text = f"Player {winner} wins!" if (NUM_PLAYERS > 1 and winner) else "Congratulations!"
+        win = title_font.render(win_text, True, (235, 245, 255))
         win_rect = win.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 - 40))
         screen.blit(win, win_rect)
         instr = font.render("按 R 重置并返回起点，ESC 退出", True, (220, 220, 220))
         instr_rect = instr.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 + 20))
         screen.blit(instr, instr_rect)
-        pygame.display.flip()
-        clock.tick(60)
+        # once the last spark is gone nothing moves any more
+        settled = not celebrating and not confetti_particles and not firework_rockets
+        present_frame(victory_key if settled else None)
+        limit_fps(60)
         continue
 
     if game_over:
+        game_over_key = ("game_over",)
+        if is_idle(game_over_key):
+            wait_for_input()
+            continue
+        if replay_skip_draw:
+            continue
         # draw background
         if background_surface is not None:
-            screen.blit(background_surface, (0, 0))
+            world.blit(background_surface, (0, 0))
         else:
-            screen.fill((20, 10, 30))
+            world.fill((20, 10, 30))
+        upscale_world()
         go = title_font.render("Game Over", True, (240, 80, 80))
         go_rect = go.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 - 20))
         screen.blit(go, go_rect)
         instr = font.render("按 R 重置并返回起点，ESC 退出", True, (220, 220, 220))
         instr_rect = instr.get_rect(center=(SCREEN_W // 2, SCREEN_H // 2 + 20))
         screen.blit(instr, instr_rect)
-        pygame.display.flip()
-        clock.tick(30)
+        present_frame(game_over_key)
+        limit_fps(30)
         continue
 
     # time in seconds since start
-    t = time.time() - start_time
+    t = sim_time() - start_time
 
     # Update stairs vertical positions (wave motion)
     for stair in STAIRS:
@@ -762,59 +1920,91 @@ while running:
             # treat as on start platform
             player_y = float(START_PLATFORM_Y - player_radius)
 
-    # If MediaPipe is enabled and camera is available, try to read hand landmarks
-    if USE_MEDIAPIPE and cap is not None:
+    # If a gesture backend and camera are available, read hand observations
+    if USE_CAMERA and cap is not None:
         try:
             ret, frame = cap.read()
+            if game_metrics is not None:
+                (game_metrics.camera_frames if ret else game_metrics.camera_dropped).inc()
             if ret:
-                # Flip and convert to RGB for MediaPipe
-                frame_flipped = cv2.flip(frame, 1)
-                frame_rgb = cv2.cvtColor(frame_flipped, cv2.COLOR_BGR2RGB)
-                results = hands.process(frame_rgb)
-                detection_score = 0.0
-                if results.multi_hand_landmarks:
-                    # Use bounding box of landmarks to compute hand_y and hand_width
-                    lm = results.multi_hand_landmarks[0]
-                    xs = [p.x for p in lm.landmark]
-                    ys = [p.y for p in lm.landmark]
-                    x_min = min(xs)
-                    x_max = max(xs)
-                    y_min = min(ys)
-                    y_max = max(ys)
-                    center_y = (y_min + y_max) / 2.0
-                    center_x = (x_min + x_max) / 2.0
-                    raw_hand_y = center_y * SCREEN_H
-                    # optionally invert mapping so lower camera y becomes smaller value
-                    with hand_lock:
-                        hand_y = (SCREEN_H - raw_hand_y) if invert_hand_y else raw_hand_y
-                        hand_width = (x_max - x_min) * SCREEN_W
-                        hand_center_x = center_x * SCREEN_W
-                    # detection confidence if available
-                    if results.multi_handedness:
-                        detection_score = float(results.multi_handedness[0].classification[0].score)
-
-                # Debug window: draw landmarks and overlay parameters
-                if show_debug_window:
-                    debug_frame = frame_flipped.copy()
-                    if results.multi_hand_landmarks:
-                        mp_drawing.draw_landmarks(debug_frame, results.multi_hand_landmarks[0], mp_hands.HAND_CONNECTIONS)
-                    # overlay text
-                    disp_y = int(hand_y)
-                    disp_w = int(hand_width)
-                    cv2.putText(debug_frame, f"Hand Y: {disp_y}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-                    cv2.putText(debug_frame, f"Width: {disp_w}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-                    cv2.putText(debug_frame, f"Score: {detection_score:.2f}", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-                    cv2.imshow(debug_window_name, debug_frame)
-                    cv2.waitKey(1)
-        except Exception:
-            # if camera or mediapipe processing fails, disable and fall back
-            USE_MEDIAPIPE = False
+                now_cam = sim_time()
+                if inference_scheduler is None or inference_scheduler.should_infer(frame):
+                    t_infer = time.perf_counter()
+                    observations = gesture_backend.process(frame)
+                    if game_metrics is not None:
+                        game_metrics.inference_time.observe(time.perf_counter() - t_infer)
+                    keypoints = gesture_backend.keypoints()
+                    detection_score = 0.0
+                    if observations:
+                        # one inference pass, hands routed to players by stable tracking
+                        detections = [(label, cx, cy) for label, cx, cy, w, sc in observations]
+                        assignment = assign_hands(detections, sim_time())
+                        for player, di in enumerate(assignment):
+                            if di is None:
+                                hand_predictors[player].lost()
+                                gesture_recognizers[player].reset()
+                                continue
+                            label, center_x, center_y, box_w, det_score = observations[di]
+                            gesture_recognizers[player].push(
+                                now_cam, keypoints[di] if di < len(keypoints) else [(center_x, center_y)])
+                            raw_hand_y = center_y * SCREEN_H
+                            # optionally invert mapping so lower camera y becomes smaller value
+                            mapped_y = (SCREEN_H - raw_hand_y) if invert_hand_y else raw_hand_y
+                            set_player_hand(player, mapped_y, box_w * SCREEN_W, center_x * SCREEN_W)
+                            hand_predictors[player].observe(now_cam, (mapped_y, box_w * SCREEN_W, center_x * SCREEN_W))
+                            if player == 0:
+                                # detection confidence if available
+                                detection_score = det_score
+                    else:
+                        for pred in hand_predictors:
+                            pred.lost()
+                        for rec in gesture_recognizers:
+                            rec.reset()
+                    if inference_scheduler is not None:
+                        inference_scheduler.hand_present = bool(observations)
+
+                    # Debug window: draw the backend's view and overlay parameters
+                    if show_debug_window:
+                        debug_frame = gesture_backend.debug_image(frame)
+                        # overlay text
+                        disp_y = int(hand_y)
+                        disp_w = int(hand_width)
+                        cv2.putText(debug_frame, f"Hand Y: {disp_y}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                        cv2.putText(debug_frame, f"Width: {disp_w}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                        cv2.putText(debug_frame, f"Score: {detection_score:.2f}  [{gesture_backend.name}]", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                        if inference_scheduler is not None:
+                            cv2.putText(debug_frame, f"Inference: {inference_scheduler.inference_ratio() * 100:.0f}%  motion {inference_scheduler.last_motion:.1f}",
+                                        (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                        try:
+                            cv2.imshow(debug_window_name, debug_frame)
+                            cv2.waitKey(1)
+                        except cv2.error:
+                            # headless OpenCV build (CI with a clip source): keep tracking, drop the window
+                            print("Hand debug window unavailable (OpenCV built without GUI support)")
+                            show_debug_window = False
+                else:
+                    if game_metrics is not None:
+                        game_metrics.inference_skipped.inc()
+                    # skipped inference: extrapolate tracked hands from their last velocity
+                    for player, pred in enumerate(hand_predictors):
+                        predicted = pred.predict(now_cam)
+                        if predicted is not None:
+                            set_player_hand(player, *predicted)
+        except Exception as e:
+            # if camera or gesture processing fails, disable and fall back
+            print(f"Gesture backend '{GESTURE_BACKEND}' failed ({e}); using simulated hand")
+            USE_CAMERA = False
             try:
                 if cap is not None:
                     cap.release()
             except Exception:
                 pass
             cap = None
+    elif replayer is not None:
+        # recorded hand signals, re-applied every frame like a live camera feed
+        for player, values in enumerate(replayer.hands or ()):
+            if player < NUM_PLAYERS:
+                set_player_hand(player, *values)
     else:
         # Simulate hand movement: use a slow sawtooth pattern so the demo is visible
         hand_cycle = (t % 4.0) / 4.0  # 0->1 over 4 seconds
@@ -822,13 +2012,25 @@ while running:
         hand_width = 5 + (math.sin(t * 3.0) + 1) * 10  # oscillates 5..25
         # simulated horizontal movement for swipe testing
         hand_center_x = int(100 + hand_cycle * (SCREEN_W - 200))
+        if NUM_PLAYERS > 1:
+            # second simulated hand runs half a cycle behind the first
+            p2_cycle = ((t + 2.0) % 4.0) / 4.0
+            player2["hand_y"] = 500 - p2_cycle * 450
+            player2["hand_width"] = 5 + (math.sin(t * 3.0 + 1.3) + 1) * 10
+            player2["hand_center_x"] = int(100 + p2_cycle * (SCREEN_W - 200))
+
+    if trace_recorder is not None:
+        hands = [(hand_y, hand_width, hand_center_x)]
+        if NUM_PLAYERS > 1:
+            hands.append((player2["hand_y"], player2["hand_width"], player2["hand_center_x"]))
+        trace_recorder.hands(now_frame, hands)
 
     # Autoplay: automatically jump to next stair on a short cadence
     if AUTO_PLAY and game_started and (not is_animating_jump) and (not is_falling) and (not game_over) and (not game_won):
         next_index = current_stair_index + 1
-        if next_index < len(STAIRS) and (time.time() - _last_autoplay_time) > AUTOPLAY_INTERVAL:
+        if next_index < len(STAIRS) and (sim_time() - _last_autoplay_time) > AUTOPLAY_INTERVAL:
             if schedule_jump_to_stair(next_index, 20):
-                _last_autoplay_time = time.time()
+                _last_autoplay_time = sim_time()
 
     # Trigger jump when hand meets threshold (with cooldown & hysteresis)
     last_jump_distance = 0.0
@@ -838,14 +2040,15 @@ while running:
         if current_stair_index is None:
             current_stair_index = -1
     # Detect rightward swipe (small movement to the right) to jump to next stair
-    now = time.time()
-    if prev_hand_center_x is not None:
-        dx = hand_center_x - prev_hand_center_x
+    now = sim_time()
+    swipe_dx = detect_swipe(0, now, hand_center_x, prev_hand_center_x)
+    if swipe_dx is not None:
         # only allow jumping to the immediate next stair
         next_index = current_stair_index + 1
         if grounded and (now - last_gesture_time) > SWIPE_COOLDOWN:
-            if next_index < len(STAIRS) and dx > SWIPE_THRESHOLD:
-                if schedule_jump_to_stair(next_index, int(dx)):
+            if next_index < len(STAIRS):
+                if schedule_jump_to_stair(next_index, int(swipe_dx)):
+                    log_event("gesture", player=1, type="swipe", dx=int(swipe_dx))
                     hand_center_x = SCREEN_W + 100
     # store current center for next frame
     prev_hand_center_x = hand_center_x
@@ -855,6 +2058,7 @@ while running:
         next_index = current_stair_index + 1
         if next_index < len(STAIRS) and hand_width > 10 and (now - last_gesture_time) > SWIPE_COOLDOWN:
             if schedule_jump_to_stair(next_index, hand_width):
+                log_event("gesture", player=1, type="vertical", width=int(hand_width))
                 hand_y = SCREEN_H + 100
                 vertical_ready = False
     # re-arm vertical trigger after hand lifts back above threshold + hysteresis
@@ -868,7 +2072,7 @@ while running:
 
     # Update jump animation if active
     if is_animating_jump:
-        prog = (time.time() - anim_start_time) / JUMP_DURATION  # Calculate progress
+        prog = (sim_time() - anim_start_time) / JUMP_DURATION  # Calculate progress
         render_jump_progress = max(0.0, min(1.0, prog))  # Update render_jump_progress
         if prog >= 1.0:
             # finish animation
@@ -888,18 +2092,23 @@ while running:
                             # snap y to current stair top
                             player_y = float(expected.get("y", expected["y_base"]) - player_radius)
                             is_falling = False
+                            log_event("land", player=1, stair=current_stair_index)
                             # auto-win if this is the last stair
                             if current_stair_index == (len(STAIRS) - 1):
                                 game_won = True
+                                winner = 1
+                                log_event("game_won", player=1, seconds=round(sim_time() - start_time, 2))
                                 start_victory_celebration()
                         else:
                             # missed: fall into water
                             is_falling = True
                             fall_velocity = 0.0
+                            log_event("fall", player=1, target=pending_target_index)
                     else:
                         # invalid target -> fall
                         is_falling = True
                         fall_velocity = 0.0
+                        log_event("fall", player=1, target=pending_target_index)
                 pending_target_index = None
             except Exception:
                 pending_target_index = None
@@ -915,7 +2124,19 @@ while running:
         player_y += fall_velocity * dt
         if player_y > SCREEN_H + 20:
             is_falling = False
-            game_over = True
+            if NUM_PLAYERS > 1:
+                # two-player race: a fall only sends that player back to the start
+                reset_player_to_start()
+            else:
+                game_over = True
+                log_event("game_over", seconds=round(sim_time() - start_time, 2))
+
+    if NUM_PLAYERS > 1 and not game_won:
+        update_player2(sim_time(), dt)
+
+    # Hazards and power-ups
+    if not game_won:
+        update_entities(dt)
 
     # Update parallax target based on player progress to the right
     if PARALLAX_ENABLED and background_surface is not None:
@@ -930,6 +2151,11 @@ while running:
         # smooth follow
         parallax_offset_x += (target_px - parallax_offset_x) * PARALLAX_SMOOTH
 
+    # Record this tick's state for rewind / replay debugging
+    snapshot_ring.push(*capture_snapshot())
+    if replay_skip_draw:
+        continue
+
     # Initialize GIF writer on first use
     if RECORD_GIF and _gif_writer is None:
         try:
@@ -939,36 +2165,57 @@ while running:
         except Exception:
             pass
 
-    # Draw
+    # Draw (scene into the world surface, which is the screen itself unless --pixel-scale)
     if background_surface is not None:
         if PARALLAX_ENABLED:
             # follow player's progress with seamless wrap
-            px_mod = int(parallax_offset_x) % SCREEN_W
-            screen.blit(background_surface, (-px_mod, 0))
-            screen.blit(background_surface, (-px_mod + SCREEN_W, 0))
+            px_mod = to_view(parallax_offset_x) % VIEW_W
+            world.blit(background_surface, (-px_mod, 0))
+            world.blit(background_surface, (-px_mod + VIEW_W, 0))
         else:
-            screen.blit(background_surface, (0, 0))
+            world.blit(background_surface, (0, 0))
     else:
-        screen.fill((10, 10, 30))
+        world.fill((10, 10, 30))
 
     # Draw stairs
     for stair in STAIRS:
-        sx = int(stair["x"])
-        sy = int(stair["y"])
+        sx = to_view(stair["x"])
+        sy = to_view(stair["y"])
         if stair_image is not None:
             # blit stair image (already scaled to STAIR_WIDTH/STAIR_HEIGHT)
-            screen.blit(stair_image, (sx, sy))
+            world.blit(stair_image, (sx, sy))
         else:
-            pygame.draw.rect(screen, (0, 180, 0), (sx, sy, STAIR_WIDTH, STAIR_HEIGHT))
+            pygame.draw.rect(world, (0, 180, 0), (sx, sy, to_view(STAIR_WIDTH), to_view(STAIR_HEIGHT)))
 
     # Draw start platform (image if available)
-    draw_start_platform(screen)
+    draw_start_platform(world)
+
+    # Player 2 track (same stairs, shifted down)
+    if NUM_PLAYERS > 1:
+        for stair in STAIRS:
+            sx = to_view(stair["x"])
+            sy = to_view(stair["y"] + P2_TRACK_OFFSET_Y)
+            if stair_image is not None:
+                world.blit(stair_image, (sx, sy))
+            else:
+                pygame.draw.rect(world, (0, 140, 160), (sx, sy, to_view(STAIR_WIDTH), to_view(STAIR_HEIGHT)))
+        draw_start_platform(world, P2_TRACK_OFFSET_Y)
+        draw_player2(world)
+
+    draw_entities(world)
 
     # Draw player
-    draw_player(screen)
+    draw_player(world)
+    upscale_world()
+    if NUM_PLAYERS > 1:
+        draw_player_labels(screen)
 
     # HUD
     info = f"Hand Y: {int(hand_y)}  Width: {int(hand_width)}  Last Jump: {int(last_jump_distance)}"
+    if entity_store is not None:
+        info += f"  Score: {score}{'  SHIELD' if shield_active else ''}"
+        if NUM_PLAYERS > 1:
+            info += f"  P2 Score: {player2['score']}{'  SHIELD' if player2['shield'] else ''}"
     text = font.render(info, True, (220, 220, 220))
     screen.blit(text, (10, 10))
 
@@ -976,7 +2223,8 @@ while running:
     ctrl_lines = [
         f"SPACE: manual jump  R: reset  I: invert mapping ({'ON' if invert_hand_y else 'OFF'})",
         f"UP/DOWN: adjust vertical trigger ({jump_threshold})  D: toggle debug window",
-        f"[/]: swipe threshold ({SWIPE_THRESHOLD})  ;/': vertical hysteresis ({VERTICAL_HYSTERESIS})"
+        f"[/]: swipe threshold ({SWIPE_THRESHOLD})  ;/': vertical hysteresis ({VERTICAL_HYSTERESIS})",
+        f"BACKSPACE: rewind ({len(snapshot_ring)} ticks)  F5/F9: quick save/load",
     ]
     for i, line in enumerate(ctrl_lines):
         t = font.render(line, True, (200, 200, 120))
@@ -992,8 +2240,8 @@ while running:
         except Exception:
             pass
 
-    pygame.display.flip()
-    clock.tick(60)
+    present_frame()
+    limit_fps(60)
 
     # Stop recording after duration
     if RECORD_GIF and _gif_writer is not None and _record_end_time is not None:
@@ -1004,11 +2252,31 @@ while running:
                 pass
             running = False
 
+if frame_exporter is not None:
+    frame_exporter.close()
+if soak_monitor is not None:
+    soak_monitor.close()
+if trace_recorder is not None:
+    trace_recorder.close(sim_time())
+if replay_writer is not None:
+    replay_writer.close()
+if telemetry is not None:
+    log_event("session_end", seconds=round(time.time() - telemetry.started, 2))
+    telemetry.close()
+if metrics_exporter is not None:
+    metrics_exporter.close()
 pygame.quit()
+if SNAPSHOT_DUMP_PATH:
+    try:
+        snapshot_ring.dump(SNAPSHOT_DUMP_PATH)
+    except Exception as e:
+        print("Snapshot dump failed:", e)
 # cleanup camera and debug window
 try:
-    if USE_MEDIAPIPE and cap is not None:
+    if USE_CAMERA and cap is not None:
         cap.release()
+    if gesture_backend is not None:
+        gesture_backend.close()
 except Exception:
     pass
 try:
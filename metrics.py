@@ -0,0 +1,274 @@
+# In-process metrics for fleet monitoring, exported in Prometheus text format
+#
+# The game thread only touches plain Python numbers: Counter.inc() and
+# Gauge.set() are one attribute update, Histogram.observe() a bisect plus three
+# increments (well under a microsecond). No locks are taken on that path; a
+# scrape may see a histogram mid-update, which is harmless for monitoring.
+# Gauges can also be backed by a callback (len of a particle list, ...), which
+# is only evaluated when the metrics are rendered, off the game thread.
+#
+# MetricsExporter runs one background thread that, every `interval` seconds,
+# derives windowed values (FPS, frame-time percentiles, camera drop ratio) and
+# writes the text file if one is configured. The file is replaced atomically,
+# so node_exporter's textfile collector can pick it up directly. With a port,
+# a localhost-only HTTP server answers GET /metrics.
+#
+#   python main.py --metrics=/var/lib/node_exporter/game_demo.prom
+#   python main.py --metrics-port=9464 && curl http://127.0.0.1:9464/metrics
+
+import bisect
+import os
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EXPORT_INTERVAL = 10.0     # seconds between text-file writes / derived updates
+# frame and inference times in seconds: 1 ms .. 1 s, dense around 16-33 ms
+TIME_BUCKETS = (0.001, 0.002, 0.004, 0.008, 0.012, 0.016, 0.020, 0.025, 0.033,
+                0.050, 0.075, 0.100, 0.250, 0.500, 1.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+def _format_value(v):
+    if v == float("inf"):
+        return "+Inf"
+    if isinstance(v, float) and v.is_integer() and abs(v) < 1e15:
+        return str(int(v))
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value", "fn")
+
+    def __init__(self, fn=None):
+        self.value = 0
+        self.fn = fn
+
+    def set(self, value):
+        self.value = value
+
+    def read(self):
+        if self.fn is None:
+            return self.value
+        try:
+            return self.fn()
+        except Exception:
+            return float("nan")
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=TIME_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot: above the top bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q, counts):
+        """Estimate quantile `q` from per-bucket `counts` (linear within a bucket)."""
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if n and seen + n >= rank:
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = upper
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Named metric families; each label set of a family is its own metric object."""
+
+    def __init__(self):
+        self._families = {}   # name -> [type, help, {label_key: metric}]
+        self._lock = threading.Lock()  # registration only, never taken on update
+
+    def _get(self, kind, name, help_text, labels, factory):
+        family = self._families.get(name)
+        key = _label_key(labels)
+        if family is not None:
+            metric = family[2].get(key)
+            if metric is not None:
+                return metric
+        with self._lock:
+            family = self._families.setdefault(name, [kind, help_text, {}])
+            if family[0] != kind:
+                raise ValueError(f"metric {name} already registered as a {family[0]}")
+            # copy-on-write so the exporter thread never iterates a dict that is growing
+            series = dict(family[2])
+            metric = series.setdefault(key, factory())
+            family[2] = series
+            return metric
+
+    def counter(self, name, help_text="", **labels):
+        return self._get("counter", name, help_text, labels, Counter)
+
+    def gauge(self, name, help_text="", fn=None, **labels):
+        return self._get("gauge", name, help_text, labels, lambda: Gauge(fn))
+
+    def histogram(self, name, help_text="", buckets=TIME_BUCKETS, **labels):
+        return self._get("histogram", name, help_text, labels, lambda: Histogram(buckets))
+
+    def render(self):
+        """The whole registry in Prometheus text exposition format."""
+        lines = []
+        for name, (kind, help_text, series) in sorted(list(self._families.items())):
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, metric in series.items():
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(metric.value)}")
+                elif kind == "gauge":
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(metric.read())}")
+                else:
+                    counts = list(metric.counts)
+                    cumulative = 0
+                    for bound, n in zip(metric.buckets + (float("inf"),), counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(metric.sum)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+class GameMetrics:
+    """The game's metric set, registered up front so the frame path is attribute access only."""
+
+    def __init__(self, registry=None):
+        r = self.registry = registry or MetricsRegistry()
+        self.frame_time = r.histogram("game_frame_seconds", "Work time per presented frame (without the frame-cap sleep)")
+        self.inference_time = r.histogram("game_inference_seconds", "Gesture backend process() latency")
+        self.camera_frames = r.counter("game_camera_frames_total", "Camera frames read successfully")
+        self.camera_dropped = r.counter("game_camera_dropped_total", "Camera reads that returned no frame")
+        self.inference_skipped = r.counter("game_inference_skipped_total", "Camera frames served by prediction instead of inference")
+        self.fps = r.gauge("game_fps", "Presented frames per second over the last export window")
+        self.frame_quantiles = {q: r.gauge("game_frame_seconds_window", "Frame work-time quantiles over the last export window",
+                                           quantile=q) for q in QUANTILES}
+        self.inference_quantiles = {q: r.gauge("game_inference_seconds_window", "Inference latency quantiles over the last export window",
+                                               quantile=q) for q in QUANTILES}
+        self.camera_drop_ratio = r.gauge("game_camera_drop_ratio", "Fraction of camera reads without a frame over the last export window")
+        r.gauge("game_start_time_seconds", "Unix time the game process started").set(time.time())
+        self._prev = None
+
+    def event(self, kind, **fields):
+        """Count a play event (jump, fall, game_won, ...), labelled by player when known."""
+        labels = {"kind": kind}
+        if "player" in fields:
+            labels["player"] = fields["player"]
+        self.registry.counter("game_events_total", "Play events by kind", **labels).inc()
+
+    def update_window(self, elapsed):
+        """Derive the windowed gauges from the change since the previous call."""
+        state = (self.frame_time.count, list(self.frame_time.counts), list(self.inference_time.counts),
+                 self.camera_frames.value, self.camera_dropped.value)
+        prev, self._prev = self._prev, state
+        if prev is None or elapsed <= 0:
+            return
+        frames = state[0] - prev[0]
+        self.fps.set(round(frames / elapsed, 2))
+        frame_delta = [a - b for a, b in zip(state[1], prev[1])]
+        infer_delta = [a - b for a, b in zip(state[2], prev[2])]
+        for q, g in self.frame_quantiles.items():
+            g.set(round(self.frame_time.quantile(q, frame_delta), 6))
+        for q, g in self.inference_quantiles.items():
+            g.set(round(self.inference_time.quantile(q, infer_delta), 6))
+        reads = (state[3] - prev[3]) + (state[4] - prev[4])
+        self.camera_drop_ratio.set(round((state[4] - prev[4]) / reads, 4) if reads else 0.0)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # no per-scrape console spam
+
+
+class MetricsExporter:
+    """Background text-file writer and/or localhost HTTP endpoint for GameMetrics."""
+
+    def __init__(self, metrics, path=None, port=None, interval=EXPORT_INTERVAL):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.server = None
+        if port is not None:
+            handler = type("MetricsHandler", (_Handler,), {"registry": metrics.registry})
+            self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        last = time.time()
+        self.metrics.update_window(0.0)
+        while not self._stop.wait(self.interval):
+            now = time.time()
+            self.metrics.update_window(now - last)
+            last = now
+            self._write()
+        self._write()
+
+    def _write(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.metrics.registry.render())
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print("Metrics write failed:", e)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
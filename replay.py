@@ -0,0 +1,314 @@
+# Input traces and offline replay rendering
+#
+# A live run started with --record-trace=PATH writes a JSON-lines trace: a
+# header (seed and gameplay options), then every key press, every change of
+# the hand signals (after camera / simulation, in screen pixels) and every
+# recognized gesture, stamped with seconds since the start of the run.
+# Gestures are recorded as decided live (temporal recognizer on camera
+# keypoints, or the one-frame difference of the simulated hand) and replayed
+# as-is, since the keypoints behind them are not in the trace.
+#
+# main.py --replay=PATH plays a trace back headless on a fixed timestep: the
+# simulation clock advances exactly 1/fps per frame and inputs are applied on
+# the first frame at or after their timestamp, so the same trace and seed
+# always produce the same frames, however fast they are rendered.
+#
+# Rendering a video:
+#   python replay.py trace.jsonl demo.mp4 [--fps=60] [--jobs=N] [--segment-seconds=S]
+# splits the replay into segments and renders each one in its own main.py
+# process (the game state lives at module level in main.py, so a worker is a
+# whole game process). A worker fast-forwards to its first frame without
+# drawing, then draws and encodes its frames; the segments are concatenated at
+# the end (ffmpeg stream copy for MP4, re-encoded frames for GIF).
+#
+#   python replay.py trace.jsonl --verify [--segment-seconds=S]
+# renders the trace once in segments and once in a single pass and checks that
+# every frame is identical, i.e. that fast-forwarding a worker reaches exactly
+# the state the uninterrupted replay has at that frame.
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+TRACE_VERSION = 1
+DEFAULT_FPS = 60
+SEGMENT_SECONDS = 10.0
+HAND_DECIMALS = 2
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+class TraceRecorder:
+    """Append key presses and hand-signal changes of a live run to a trace file."""
+
+    def __init__(self, path, t0, **header):
+        self.t0 = t0
+        self._f = open(path, "w", encoding="utf-8")
+        self._last_hands = None
+        self._write({"trace": TRACE_VERSION, "t0": t0, "gestures": True, **header})
+
+    def _write(self, row):
+        self._f.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+    def keys(self, now, keys):
+        if keys:
+            self._write({"t": round(now - self.t0, 4), "keys": list(keys)})
+
+    def hands(self, now, hands):
+        """`hands` is [(hand_y, hand_width, hand_center_x), ...] per player."""
+        hands = [[round(float(v), HAND_DECIMALS) for v in h] for h in hands]
+        if hands != self._last_hands:
+            self._last_hands = hands
+            self._write({"t": round(now - self.t0, 4), "hands": hands})
+
+    def gesture(self, now, player, kind, dx):
+        self._write({"t": round(now - self.t0, 4), "gesture": [player, kind, round(float(dx), HAND_DECIMALS)]})
+
+    def close(self, now):
+        self._write({"t": round(now - self.t0, 4), "end": True})
+        self._f.close()
+
+
+def load_trace(path):
+    """Return (header, input rows sorted by time, duration in seconds)."""
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    if not rows or rows[0].get("trace") != TRACE_VERSION:
+        raise ValueError(f"{path} is not a version {TRACE_VERSION} input trace")
+    header, rows = rows[0], rows[1:]
+    rows.sort(key=lambda r: r["t"])
+    duration = rows[-1]["t"] if rows else 0.0
+    return header, rows, duration
+
+
+def frame_count(duration, fps):
+    return int(duration * fps) + 1
+
+
+class TraceReplayer:
+    """Feed a trace to the game loop one fixed timestep at a time.
+
+    Frames before `start_frame` are simulated but not drawn; the replay stops
+    after `end_frame` (exclusive, default: end of the trace).
+    """
+
+    def __init__(self, path, fps=DEFAULT_FPS, start_frame=0, end_frame=None):
+        self.header, self._rows, duration = load_trace(path)
+        self.fps = fps
+        self.t0 = self.header["t0"]
+        total = frame_count(duration, fps)
+        self.start_frame = max(0, start_frame)
+        self.end_frame = total if end_frame is None else min(end_frame, total)
+        self.frame = -1
+        self.hands = None
+        # traces from before gestures were recorded fall back to live detection
+        self.recorded_gestures = bool(self.header.get("gestures"))
+        self._gestures = {}
+        self._i = 0
+
+    def advance(self):
+        """Step one frame; returns (sim time, [key codes]) or None when done."""
+        self.frame += 1
+        if self.frame >= self.end_frame:
+            return None
+        t = self.frame / self.fps
+        keys = []
+        self._gestures = {}
+        rows = self._rows
+        while self._i < len(rows) and rows[self._i]["t"] <= t:
+            row = rows[self._i]
+            keys.extend(row.get("keys", ()))
+            if "hands" in row:
+                self.hands = row["hands"]
+            if "gesture" in row:
+                player, kind, dx = row["gesture"]
+                self._gestures[player] = (kind, dx)
+            self._i += 1
+        return self.t0 + t, keys
+
+    def gesture(self, player):
+        """(kind, dx) recognized for `player` in the live run at this frame, or None."""
+        return self._gestures.get(player)
+
+    @property
+    def rendering(self):
+        return self.frame >= self.start_frame
+
+
+class GifWriter:
+    """Collect frames as fast-octree palette images and write one GIF on close.
+
+    About 3x faster per frame than imageio's GIF writer, which dominates
+    render time otherwise.
+    """
+
+    def __init__(self, path, fps):
+        self.path = path
+        self.duration = int(round(1000.0 / fps))
+        self.frames = []
+
+    def append_data(self, frame):
+        from PIL import Image
+        self.frames.append(Image.fromarray(frame).quantize(256, method=Image.Quantize.FASTOCTREE))
+
+    def append_image(self, image):
+        from PIL import Image
+        if image.mode != "P":
+            image = image.convert("RGB").quantize(256, method=Image.Quantize.FASTOCTREE)
+        self.frames.append(image)
+
+    def close(self):
+        if self.frames:
+            self.frames[0].save(self.path, save_all=True, append_images=self.frames[1:],
+                                duration=self.duration, loop=0, optimize=False)
+        self.frames = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_frame_writer(path, fps):
+    """Writer for RGB frames: GifWriter, or imageio/ffmpeg for video formats."""
+    if path.lower().endswith(".gif"):
+        return GifWriter(path, fps)
+    import imageio
+    # 800x600 is not a multiple of imageio's default 16 px macro block
+    return imageio.get_writer(path, fps=fps, macro_block_size=8)
+
+
+def _ffmpeg_exe():
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return shutil.which("ffmpeg")
+
+
+def concat_segments(paths, out, fps):
+    ffmpeg = _ffmpeg_exe()
+    if ffmpeg and not out.lower().endswith(".gif"):
+        list_path = os.path.join(os.path.dirname(paths[0]), "segments.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            for p in paths:
+                f.write(f"file '{p}'\n")
+        subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                        "-i", list_path, "-c", "copy", out], check=True)
+        return
+    if out.lower().endswith(".gif"):
+        from PIL import Image, ImageSequence
+        with GifWriter(out, fps) as writer:
+            for p in paths:
+                with Image.open(p) as seg:
+                    for frame in ImageSequence.Iterator(seg):
+                        writer.append_image(frame.copy())
+        return
+    import imageio
+    with open_frame_writer(out, fps) as writer:
+        for p in paths:
+            for frame in imageio.get_reader(p):
+                writer.append_data(frame)
+
+
+def render(trace, out, fps=DEFAULT_FPS, jobs=None, segment_seconds=SEGMENT_SECONDS, game_args=()):
+    """Render `trace` to `out` with up to `jobs` worker processes."""
+    _, _, duration = load_trace(trace)
+    total = frame_count(duration, fps)
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    seg_len = max(1, int(segment_seconds * fps))
+    segments = [(a, min(a + seg_len, total)) for a in range(0, total, seg_len)]
+    ext = ".gif" if out.lower().endswith(".gif") else ".mp4"
+    tmp = tempfile.mkdtemp(prefix="replay_")
+    seg_paths = [os.path.join(tmp, f"seg_{i:04d}{ext}") for i in range(len(segments))]
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    trace = os.path.abspath(trace)
+
+    def run(i):
+        a, b = segments[i]
+        cmd = [sys.executable, MAIN_SCRIPT, f"--replay={trace}", f"--replay-fps={fps}",
+               f"--replay-frames={a}:{b}", f"--replay-out={seg_paths[i]}", *game_args]
+        subprocess.run(cmd, check=True, env=env, stdout=subprocess.DEVNULL)
+
+    t_start = time.time()
+    try:
+        # the threads only wait on the worker processes
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(run, range(len(segments))))
+        concat_segments(seg_paths, out, fps)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    elapsed = time.time() - t_start
+    video_seconds = total / fps
+    print(f"rendered {total} frames ({video_seconds:.1f} s of video) in {len(segments)} segments "
+          f"on {jobs} workers: {elapsed:.1f} s ({elapsed / max(video_seconds, 1e-9):.2f}x real time) -> {out}")
+
+
+def _gif_frames(path):
+    from PIL import Image, ImageSequence
+    with Image.open(path) as gif:
+        return [frame.convert("RGB").tobytes() for frame in ImageSequence.Iterator(gif)]
+
+
+def verify(trace, fps=DEFAULT_FPS, jobs=None, segment_seconds=SEGMENT_SECONDS, game_args=()):
+    """Render `trace` in segments and in one pass; return the first differing frame or None."""
+    _, _, duration = load_trace(trace)
+    tmp = tempfile.mkdtemp(prefix="replay_verify_")
+    try:
+        segmented = os.path.join(tmp, "segmented.gif")
+        single = os.path.join(tmp, "single.gif")
+        render(trace, segmented, fps, jobs, segment_seconds, game_args)
+        render(trace, single, fps, 1, duration + 1.0, game_args)
+        a, b = _gif_frames(segmented), _gif_frames(single)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    for i, (fa, fb) in enumerate(zip(a, b)):
+        if fa != fb:
+            return i
+    return None if len(a) == len(b) else min(len(a), len(b))
+
+
+def _main(argv):
+    fps = DEFAULT_FPS
+    jobs = None
+    segment_seconds = SEGMENT_SECONDS
+    check = False
+    positional = []
+    game_args = []
+    for a in argv:
+        if a.startswith("--fps="):
+            fps = max(1, int(a.split("=", 1)[1]))
+        elif a.startswith("--jobs="):
+            jobs = int(a.split("=", 1)[1])
+        elif a.startswith("--segment-seconds="):
+            segment_seconds = float(a.split("=", 1)[1])
+        elif a == "--verify":
+            check = True
+        elif a.startswith("--"):
+            game_args.append(a)  # passed through to main.py, e.g. --pixel-scale=2
+        else:
+            positional.append(a)
+    if len(positional) != (1 if check else 2):
+        print("usage: python replay.py TRACE OUT [--fps=60] [--jobs=N] [--segment-seconds=S] [main.py options]\n"
+              "       python replay.py TRACE --verify [--fps=60] [--jobs=N] [--segment-seconds=S] [main.py options]")
+        return 2
+    if check:
+        frame = verify(positional[0], fps, jobs, segment_seconds, game_args)
+        if frame is not None:
+            print(f"segmented render differs from the single-pass render at frame {frame}")
+            return 1
+        print("segmented render matches the single-pass render")
+        return 0
+    render(positional[0], positional[1], fps, jobs, segment_seconds, game_args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,180 @@
+# Soak-test monitor for long unattended runs (kiosks)
+#
+# main.py --soak cycles title -> autoplay -> victory/game over -> title for
+# hours. Every report interval this module records
+#   - allocated Python blocks (sys.getallocatedblocks) and process RSS (the
+#     latter also catches SDL surfaces and camera buffers; Linux only)
+#   - a tracemalloc snapshot of the allocations made during the last
+#     `trace_seconds` of the interval that are still alive, grouped by source
+#     line (a leak keeps showing up there report after report)
+#   - percentiles of per-frame work time (excluding the frame-cap sleep)
+#   - caller-supplied sizes (particle lists, entity count, ...)
+# and flags any series that grew on every one of the last few reports.
+#
+# tracemalloc is only switched on for the short window before each report:
+# main.py runs its game loop at module level, and resolving the line number of
+# every allocation in that huge code object slows frames down by 10-100x while
+# tracing. Frames inside the window are left out of the frame-time stats.
+#
+# Reports are printed and appended as JSON lines to the report file.
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+SOAK_REPORT_INTERVAL = 60.0   # seconds between reports
+TRACE_SECONDS = 5.0           # tracemalloc window at the end of each interval
+DRIFT_WINDOW = 8              # consecutive reports that must each grow to flag drift
+# minimum total growth across the window before a series is flagged
+DRIFT_MIN_GROWTH = {
+    "blocks": 2000,
+    "rss_kb": 4096,
+    "p95_ms": 2.0,
+}
+DRIFT_MIN_GROWTH_DEFAULT = 1
+TOP_RETAINED_LINES = 3
+
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>",
+                  "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[i]
+
+
+def _rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except Exception:
+        return None
+
+
+def _is_monotonic_growth(values, min_growth):
+    if len(values) < 2 or any(v is None for v in values):
+        return False
+    # strictly rising: plateaus (a ring buffer filling up) and noise are not drift
+    rising = all(b > a for a, b in zip(values, values[1:]))
+    return rising and values[-1] - values[0] >= min_growth
+
+
+class SoakMonitor:
+    """Periodic memory / frame-time reports with monotonic-drift detection."""
+
+    def __init__(self, report_path=None, interval=SOAK_REPORT_INTERVAL, trace_seconds=TRACE_SECONDS):
+        self.report_path = report_path
+        self.interval = interval
+        self.trace_seconds = min(trace_seconds, interval * 0.5)
+        self.started = time.time()
+        self.reports = []
+        self.flagged = set()
+        self.cycles = 0
+        self.tracing = False
+        self._frame_times = []
+        self._last_report = self.started
+
+    def frame(self, dt):
+        if not self.tracing:
+            self._frame_times.append(dt)
+
+    def poll(self, now=None):
+        """Open the trace window when it is time; True when a report is due."""
+        elapsed = (now or time.time()) - self._last_report
+        if not self.tracing and elapsed >= self.interval - self.trace_seconds:
+            tracemalloc.start(1)
+            self.tracing = True
+        return elapsed >= self.interval
+
+    def report(self, **sizes):
+        """Record one report and return the names of newly flagged series."""
+        now = time.time()
+        self._last_report = now
+        blocks = sys.getallocatedblocks()
+        retained_kb = 0
+        retained = []
+        if self.tracing:
+            snap = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, name) for name in _IGNORED_FILES])
+            tracemalloc.stop()
+            self.tracing = False
+            stats = snap.statistics("lineno")
+            retained_kb = sum(s.size for s in stats) // 1024
+            for stat in stats[:TOP_RETAINED_LINES]:
+                frame = stat.traceback[0]
+                retained.append(f"{frame.filename}:{frame.lineno} {stat.size // 1024} KiB in {stat.count} blocks")
+        ms = sorted(t * 1000.0 for t in self._frame_times)
+        self._frame_times = []
+        entry = {
+            "t": round(now - self.started, 1),
+            "cycles": self.cycles,
+            "frames": len(ms),
+            "blocks": blocks,
+            "rss_kb": _rss_kb(),
+            "p50_ms": round(_percentile(ms, 0.50), 3),
+            "p95_ms": round(_percentile(ms, 0.95), 3),
+            "p99_ms": round(_percentile(ms, 0.99), 3),
+            "sizes": sizes,
+            "retained_kb": retained_kb,
+            "retained_top": retained,
+        }
+        self.reports.append(entry)
+        new_flags = self._check_drift()
+        entry["drift"] = sorted(new_flags)
+        self._emit(entry)
+        return new_flags
+
+    def _series(self, key):
+        window = self.reports[-DRIFT_WINDOW:]
+        if key.startswith("sizes."):
+            name = key[len("sizes."):]
+            return [r["sizes"].get(name) for r in window]
+        return [r.get(key) for r in window]
+
+    def _check_drift(self):
+        if len(self.reports) < DRIFT_WINDOW:
+            return set()
+        keys = ["blocks", "rss_kb", "p95_ms"]
+        keys += ["sizes." + k for k in self.reports[-1]["sizes"]]
+        new_flags = set()
+        for key in keys:
+            min_growth = DRIFT_MIN_GROWTH.get(key, DRIFT_MIN_GROWTH_DEFAULT)
+            if _is_monotonic_growth(self._series(key), min_growth) and key not in self.flagged:
+                self.flagged.add(key)
+                new_flags.add(key)
+        return new_flags
+
+    def _emit(self, entry):
+        sizes = " ".join(f"{k}={v}" for k, v in entry["sizes"].items())
+        print(f"[soak {entry['t']:>8.0f}s] cycles={entry['cycles']} blocks={entry['blocks']} "
+              f"rss={entry['rss_kb']}KiB p50={entry['p50_ms']}ms p95={entry['p95_ms']}ms "
+              f"retained={entry['retained_kb']}KiB {sizes}")
+        for key in entry["drift"]:
+            print(f"[soak] DRIFT: {key} grew on each of the last {DRIFT_WINDOW} reports")
+        if entry["drift"]:
+            for line in entry["retained_top"]:
+                print("[soak]   retained:", line)
+        if self.report_path:
+            try:
+                with open(self.report_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            except Exception as e:
+                print("Soak report write failed:", e)
+
+    def close(self):
+        """Print a final summary; returns True if no drift was flagged."""
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+        hours = (time.time() - self.started) / 3600.0
+        if self.flagged:
+            print(f"[soak] finished after {hours:.2f} h, {self.cycles} cycles; "
+                  f"drift in: {', '.join(sorted(self.flagged))}")
+        else:
+            print(f"[soak] finished after {hours:.2f} h, {self.cycles} cycles; no drift detected")
+        return not self.flagged
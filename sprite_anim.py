@@ -0,0 +1,148 @@
+# Player sprite animation with a cache of pre-transformed frames
+#
+# The player is drawn from one of four key sprites (idle / jump / air / land)
+# with squash & stretch on takeoff and landing, a lean that follows the jump
+# arc, mirroring for leftward jumps and a neon glow outline in the player's
+# colour. rotozoom + flip + glow cost a few hundred microseconds per sprite,
+# too much to redo every frame, so SpriteFrameCache quantizes each pose (rotation in
+# ANGLE_STEP degrees, scale in SCALE_STEP steps) and keeps the transformed
+# surfaces in an LRU dict. Drawing is then a dict lookup plus a blit; the poses a
+# jump passes through can be baked at load time with prebake().
+
+import math
+
+from collections import OrderedDict
+
+import pygame
+
+ANGLE_STEP = 5            # degrees per rotation bucket
+SCALE_STEP = 0.05         # per-axis scale bucket
+CACHE_FRAMES = 512        # LRU capacity (transformed surfaces)
+GLOW_RADIUS = 3           # outline thickness in pixels at full resolution
+GLOW_ALPHA = 150          # alpha of the innermost glow ring
+
+# Pose curves over jump progress (0..1)
+TAKEOFF_END = 0.15        # stretch relaxes over the first part of the jump
+LANDING_START = 0.85      # squash over the last part
+TAKEOFF_STRETCH = 0.2     # extra height at the instant of takeoff
+LANDING_SQUASH = 0.2      # extra width / lost height at the deepest squash
+ARC_TILT = 20.0           # degrees of lean: forward going up, back coming down
+FALL_TILT = 30.0
+PRE_BAKE_STEPS = 100      # progress samples per jump when prebaking
+
+
+def player_pose(animating, progress, falling, facing=1):
+    """(angle, scale_x, scale_y) for a player; `facing` is +1 right / -1 left."""
+    if animating:
+        p = progress if progress is not None else 0.0
+        if p < TAKEOFF_END:
+            s = 1.0 - p / TAKEOFF_END
+            return 0.0, 1.0 - TAKEOFF_STRETCH * 0.6 * s, 1.0 + TAKEOFF_STRETCH * s
+        if p >= LANDING_START:
+            s = math.sin(math.pi * (p - LANDING_START) / (1.0 - LANDING_START))
+            return 0.0, 1.0 + LANDING_SQUASH * s, 1.0 - LANDING_SQUASH * s
+        a = (p - TAKEOFF_END) / (LANDING_START - TAKEOFF_END)
+        # rotozoom angles are counter-clockwise: leaning into a rightward jump is negative
+        return -facing * ARC_TILT * math.cos(math.pi * a), 1.0, 1.0
+    if falling:
+        return -facing * FALL_TILT, 0.92, 1.1
+    return 0.0, 1.0, 1.0
+
+
+class SpriteFrameCache:
+    """LRU cache of flipped / scaled / rotated / glowing variants of sprites.
+
+    Frames are keyed by the source surface and the quantized pose, so sprites
+    that are replaced (e.g. pixel-art downscaling) simply stop being hit and
+    age out.
+    """
+
+    def __init__(self, max_frames=CACHE_FRAMES, angle_step=ANGLE_STEP, scale_step=SCALE_STEP,
+                 glow_radius=GLOW_RADIUS):
+        self.max_frames = max_frames
+        self.angle_step = angle_step
+        self.scale_step = scale_step
+        self.glow_radius = glow_radius
+        self._frames = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    def key(self, sprite, angle=0.0, sx=1.0, sy=1.0, flip=False, glow=None):
+        qa = int(round(angle / self.angle_step)) % (360 // self.angle_step)
+        qx = int(round(sx / self.scale_step))
+        qy = int(round(sy / self.scale_step))
+        return sprite, qa, qx, qy, bool(flip), glow
+
+    def get(self, sprite, angle=0.0, sx=1.0, sy=1.0, flip=False, glow=None):
+        """Transformed `sprite`; same center as the original when blitted by center."""
+        key = self.key(sprite, angle, sx, sy, flip, glow)
+        frame = self._frames.get(key)
+        if frame is not None:
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return frame
+        self.misses += 1
+        frame = self._bake(*key)
+        self._frames[key] = frame
+        if len(self._frames) > self.max_frames:
+            self._frames.popitem(last=False)
+        return frame
+
+    def prebake(self, poses):
+        """Bake (sprite, angle, sx, sy, flip, glow) poses ahead of time; returns how many were new."""
+        before = self.misses
+        for pose in poses:
+            self.get(*pose)
+        return self.misses - before
+
+    def _bake(self, sprite, qa, qx, qy, flip, glow):
+        frame = pygame.transform.flip(sprite, True, False) if flip else sprite
+        unit = int(round(1.0 / self.scale_step))
+        if (qx, qy) != (unit, unit):
+            w, h = frame.get_size()
+            size = (max(1, int(round(w * qx * self.scale_step))), max(1, int(round(h * qy * self.scale_step))))
+            frame = pygame.transform.smoothscale(frame, size)
+        if qa:
+            frame = pygame.transform.rotozoom(frame, qa * self.angle_step, 1.0)
+        if glow is not None and self.glow_radius > 0:
+            frame = self._glow(frame, glow)
+        return frame
+
+    def _glow(self, frame, color):
+        """Neon outline: rings of the sprite silhouette, fading outwards, under the sprite."""
+        r = self.glow_radius
+        w, h = frame.get_size()
+        out = pygame.Surface((w + 2 * r, h + 2 * r), pygame.SRCALPHA)
+        mask = pygame.mask.from_surface(frame)
+        for ring in range(r, 0, -1):
+            alpha = int(GLOW_ALPHA * (1.0 - (ring - 1) / r))
+            silhouette = mask.to_surface(setcolor=(*color[:3], alpha), unsetcolor=(0, 0, 0, 0))
+            for dx, dy in ((-ring, 0), (ring, 0), (0, -ring), (0, ring),
+                           (-ring, -ring), (ring, ring), (-ring, ring), (ring, -ring)):
+                out.blit(silhouette, (r + dx, r + dy), special_flags=pygame.BLEND_RGBA_MAX)
+        out.blit(frame, (r, r))
+        return out
+
+
+def jump_poses(sprite_for, colors, steps=PRE_BAKE_STEPS):
+    """(sprite, angle, sx, sy, flip, glow) poses of a jump sampled at `steps` points,
+    plus falling and standing, for both facings.
+
+    `sprite_for(animating, progress, falling)` is the game's key-sprite picker;
+    `colors` are the glow colours in use (None for no glow).
+    """
+    states = [(True, i / steps, False) for i in range(steps + 1)]
+    states += [(False, None, True), (False, None, False)]
+    poses = []
+    for animating, progress, falling in states:
+        sprite = sprite_for(animating, progress, falling)
+        if sprite is None:
+            continue
+        for facing in (1, -1):
+            pose = player_pose(animating, progress, falling, facing)
+            for color in colors:
+                poses.append((sprite, *pose, facing < 0, color))
+    return poses
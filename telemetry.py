@@ -0,0 +1,183 @@
+# Session telemetry: structured play events buffered in memory and flushed in
+# batches by a background thread into an append-only SQLite database (WAL mode).
+#
+# The game thread only appends a tuple to a deque in log(); serialization and all
+# disk I/O happen on the writer thread.
+#
+# Query per-day aggregates:
+#   python telemetry.py                 # telemetry.db, last 7 days
+#   python telemetry.py path.db --days=30
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+from collections import deque
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "telemetry.db")
+FLUSH_INTERVAL = 2.0       # seconds between batch writes
+FRAME_STATS_WINDOW = 5.0   # seconds of frame times summarized per frame_stats event
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    ts      REAL NOT NULL,
+    session TEXT NOT NULL,
+    kind    TEXT NOT NULL,
+    data    TEXT
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+"""
+
+
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[i]
+
+
+class Telemetry:
+    """Buffer play events and write them to SQLite off the render thread."""
+
+    def __init__(self, path=DEFAULT_DB_PATH, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.session = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.flush_interval = flush_interval
+        self._pending = deque()
+        self._frame_times = []
+        self._frame_window_start = time.time()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self._thread.start()
+
+    # --- game thread ---------------------------------------------------------
+    def log(self, kind, **fields):
+        # deque.append / popleft are thread-safe, so no lock on the frame path
+        self._pending.append((time.time(), kind, fields))
+
+    def frame(self, dt):
+        """Record one frame time (seconds); emits a frame_stats event per window."""
+        self._frame_times.append(dt)
+        now = time.time()
+        if now - self._frame_window_start >= FRAME_STATS_WINDOW:
+            # raw samples are summarized on the writer thread
+            self._pending.append((now, "frame_stats", {"_frame_times": self._frame_times}))
+            self._frame_times = []
+            self._frame_window_start = now
+
+    def close(self):
+        if self._frame_times:
+            self._pending.append((time.time(), "frame_stats", {"_frame_times": self._frame_times}))
+            self._frame_times = []
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+
+    # --- writer thread -------------------------------------------------------
+    def _run(self):
+        try:
+            db = sqlite3.connect(self.path)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+        except Exception as e:
+            print("Telemetry disabled:", e)
+            return
+        while True:
+            stopping = self._stop.wait(self.flush_interval)
+            self._flush(db)
+            if stopping:
+                break
+        db.close()
+
+    def _flush(self, db):
+        batch = []
+        try:
+            while True:
+                batch.append(self._pending.popleft())
+        except IndexError:
+            pass
+        if not batch:
+            return
+        rows = []
+        for ts, kind, fields in batch:
+            if kind == "frame_stats":
+                fields = self._summarize_frames(fields.pop("_frame_times"))
+            rows.append((ts, self.session, kind, json.dumps(fields, separators=(",", ":"))))
+        try:
+            with db:
+                db.executemany("INSERT INTO events (ts, session, kind, data) VALUES (?, ?, ?, ?)", rows)
+        except Exception as e:
+            print("Telemetry write failed:", e)
+
+    @staticmethod
+    def _summarize_frames(times):
+        ms = sorted(t * 1000.0 for t in times)
+        return {
+            "frames": len(ms),
+            "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+            "p50_ms": round(_percentile(ms, 0.50), 3),
+            "p95_ms": round(_percentile(ms, 0.95), 3),
+            "p99_ms": round(_percentile(ms, 0.99), 3),
+            "max_ms": round(ms[-1], 3) if ms else 0.0,
+        }
+
+
+def query_daily(path=DEFAULT_DB_PATH, days=7):
+    """Return per-day aggregate rows (oldest first) for the last `days` days."""
+    db = sqlite3.connect(path)
+    since = time.time() - days * 86400
+    rows = db.execute(
+        """
+        SELECT date(ts, 'unixepoch', 'localtime') AS day,
+               COUNT(DISTINCT session),
+               SUM(kind = 'gesture'),
+               SUM(kind = 'jump'),
+               SUM(kind = 'land'),
+               SUM(kind = 'fall'),
+               SUM(kind = 'game_over'),
+               SUM(kind = 'game_won'),
+               SUM(CASE WHEN kind = 'frame_stats' THEN json_extract(data, '$.frames') END),
+               AVG(CASE WHEN kind = 'frame_stats' THEN json_extract(data, '$.mean_ms') END),
+               MAX(CASE WHEN kind = 'frame_stats' THEN json_extract(data, '$.p95_ms') END)
+        FROM events
+        WHERE ts >= ?
+        GROUP BY day
+        ORDER BY day
+        """,
+        (since,),
+    ).fetchall()
+    db.close()
+    return rows
+
+
+def _main(argv):
+    path = DEFAULT_DB_PATH
+    days = 7
+    for a in argv:
+        if a.startswith("--days="):
+            days = int(a.split("=", 1)[1])
+        elif not a.startswith("--"):
+            path = a
+    if not os.path.exists(path):
+        print(f"No telemetry database at {path}")
+        return 1
+    header = ("day", "sessions", "gestures", "jumps", "landings", "falls",
+              "game_over", "wins", "frames", "mean_ms", "worst_p95_ms")
+    print("  ".join(f"{h:>12}" for h in header))
+    for row in query_daily(path, days):
+        cells = []
+        for v in row:
+            if v is None:
+                v = 0
+            cells.append(f"{v:>12.2f}" if isinstance(v, float) else f"{v:>12}")
+        print("  ".join(cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
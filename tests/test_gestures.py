@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+import pytest
+
+from hand_tracking import GestureRecognizer
+
+T0 = 100.0
+
+
+def _kinds(xs, fps):
+    """Gesture kinds recognized from a centroid moving along `xs` at `fps`."""
+    rec = GestureRecognizer()
+    kinds = []
+    for i, x in enumerate(xs):
+        t = T0 + i / fps
+        rec.push(t, np.array([[x, 0.5]], dtype=np.float32))
+        g = rec.poll(t)
+        if g is not None:
+            kinds.append(g.kind)
+    return kinds
+
+
+def _wave(freq, amplitude, fps, seconds=3.0):
+    return [0.5 + amplitude * math.sin(2.0 * math.pi * freq * i / fps) for i in range(int(seconds * fps))]
+
+
+def _swipe(distance, seconds, fps, direction=1, rest=0.5):
+    x0 = 0.5 - direction * distance / 2.0
+    n = int(seconds * fps)
+    stroke = [x0 + direction * distance * (0.5 - 0.5 * math.cos(math.pi * (k + 1) / n)) for k in range(n)]
+    return [x0] * int(rest * fps) + stroke + [stroke[-1]] * int(rest * fps)
+
+
+@pytest.mark.parametrize("fps", [30, 60])
+@pytest.mark.parametrize("freq, amplitude", [(1.0, 0.1), (1.0, 0.2), (1.5, 0.1), (2.0, 0.1),
+                                             (2.0, 0.05), (3.0, 0.05), (4.0, 0.05)])
+def test_wave_is_not_a_series_of_swipes(freq, amplitude, fps):
+    kinds = _kinds(_wave(freq, amplitude, fps), fps)
+    assert "wave" in kinds
+    assert not [k for k in kinds if k.startswith("swipe")]
+
+
+@pytest.mark.parametrize("fps", [12, 30, 60])
+@pytest.mark.parametrize("distance, seconds", [(0.25, 0.15), (0.3, 0.2), (0.4, 0.3), (0.5, 0.4)])
+@pytest.mark.parametrize("direction, kind", [(1, "swipe_right"), (-1, "swipe_left")])
+def test_single_stroke_is_one_swipe(distance, seconds, fps, direction, kind):
+    assert _kinds(_swipe(distance, seconds, fps, direction), fps) == [kind]
+
+
+@pytest.mark.parametrize("fps", [30, 60])
+def test_slow_return_after_swipe_is_ignored(fps):
+    xs = _swipe(0.3, 0.2, fps)
+    back = [xs[-1] - 0.3 * k / (0.8 * fps) for k in range(int(0.8 * fps))]
+    assert _kinds(xs + back + [back[-1]] * fps, fps) == ["swipe_right"]
+
+
+@pytest.mark.parametrize("fps", [12, 30, 60])
+def test_still_or_slow_hand_is_no_gesture(fps):
+    assert _kinds([0.5] * (3 * fps), fps) == []
+    assert _kinds([0.3 + 0.1 * i / fps for i in range(3 * fps)], fps) == []
+    assert _kinds(_swipe(0.2, 0.5, fps), fps) == []
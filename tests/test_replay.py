@@ -0,0 +1,17 @@
+import json
+
+import replay
+
+
+def _write_trace(path, seconds, **header):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"trace": replay.TRACE_VERSION, "t0": 1000.0, "gestures": True, **header}) + "\n")
+        f.write(json.dumps({"t": seconds, "end": True}) + "\n")
+
+
+def test_segmented_render_matches_single_pass(tmp_path):
+    # an auto-started round (as recorded with --record-gif) driven by autoplay;
+    # the segment boundaries fall inside the round
+    trace = str(tmp_path / "trace.jsonl")
+    _write_trace(trace, 2.0, seed=7, players=2, hazards=10, pickups=3, autoplay=True, autostart=True)
+    assert replay.verify(trace, segment_seconds=0.75, jobs=2) is None